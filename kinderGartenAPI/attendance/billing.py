@@ -0,0 +1,86 @@
+"""
+Monthly extra hour statements.
+
+Approved ExtraHourRequest durations are summed by the database
+(end - start per row, SUM per child) for one tenant and one month, and stored
+as ExtraHourStatement rows with a single upsert.
+"""
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+
+from .models import ExtraHourRequest, ExtraHourStatement, ExtraHourStatus
+from .partitions import add_months
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def monthly_minutes(tenant_id, month):
+    """
+    Return {child_id: (minutes, requests_count)} of approved extra hours.
+    Requests whose end is not after their start are ignored.
+    """
+    month = month_start(month)
+    totals = (
+        ExtraHourRequest.objects.filter(
+            tenant_id=tenant_id,
+            status=ExtraHourStatus.APPROVED,
+            date__gte=month,
+            date__lt=add_months(month, 1),
+            end__gt=F("start"),
+        )
+        .order_by()
+        .values("child_id")
+        .annotate(
+            duration=Sum(
+                ExpressionWrapper(F("end") - F("start"), output_field=DurationField())
+            ),
+            requests_count=Count("id"),
+        )
+    )
+    return {
+        row["child_id"]: (
+            int(row["duration"].total_seconds() // 60),
+            row["requests_count"],
+        )
+        for row in totals
+    }
+
+
+@transaction.atomic
+def generate_statements(tenant_id, month):
+    """
+    Create or refresh the statements of a tenant for one month.
+
+    Returns:
+        Number of statements written
+    """
+    month = month_start(month)
+    totals = monthly_minutes(tenant_id, month)
+
+    ExtraHourStatement.objects.bulk_create(
+        [
+            ExtraHourStatement(
+                tenant_id=tenant_id,
+                child_id=child_id,
+                month=month,
+                minutes=minutes,
+                requests_count=count,
+            )
+            for child_id, (minutes, count) in totals.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["tenant", "child", "month"],
+        update_fields=["minutes", "requests_count", "updated_at"],
+    )
+    # Children whose approved requests were since rejected or deleted
+    ExtraHourStatement.objects.filter(tenant_id=tenant_id, month=month).exclude(
+        child_id__in=totals
+    ).delete()
+
+    return len(totals)
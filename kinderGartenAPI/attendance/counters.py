@@ -0,0 +1,120 @@
+"""
+Maintained attendance counters.
+
+Every attendance write recounts the DailyAttendanceCounter row of its
+tenant/day with one aggregate over that day's records (recount_day); reads go
+through the cache and fall back to that single row. The counter row is locked
+before counting, so concurrent writers recount one after the other and the
+last one sees every committed record. rebuild_counters() recomputes rows from
+raw AttendanceRecord data when they drift.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import AttendanceRecord, AttendanceStatus, DailyAttendanceCounter
+
+SUMMARY_CACHE_TIMEOUT = 60 * 5  # 5 minutes
+
+
+def summary_cache_key(tenant_id, day):
+    return f"attendance:summary:{tenant_id}:{day.isoformat()}"
+
+
+def invalidate_summary(tenant_id, day):
+    """Drop the cached summary now and again once the transaction commits"""
+    key = summary_cache_key(tenant_id, day)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _status_counts():
+    return {
+        "present": Count("id", filter=Q(status=AttendanceStatus.PRESENT)),
+        "absent": Count("id", filter=Q(status=AttendanceStatus.ABSENT)),
+    }
+
+
+@transaction.atomic
+def recount_day(tenant_id, day):
+    """Recompute the counter row of a tenant/day, creating it if needed"""
+    DailyAttendanceCounter.objects.bulk_create(
+        [DailyAttendanceCounter(tenant_id=tenant_id, date=day)],
+        ignore_conflicts=True,
+    )
+    counter = DailyAttendanceCounter.objects.filter(tenant_id=tenant_id, date=day)
+    # Lock first: the count below then sees writers that held the lock before
+    list(counter.select_for_update().values_list("id", flat=True))
+    totals = AttendanceRecord.objects.filter(
+        tenant_id=tenant_id, date=day
+    ).aggregate(**_status_counts())
+    counter.update(**totals, updated_at=timezone.now())
+    invalidate_summary(tenant_id, day)
+
+
+def get_summary(tenant_id, day):
+    """Return {"present": n, "absent": n} for a tenant/day from cache or one row"""
+    key = summary_cache_key(tenant_id, day)
+    summary = cache.get(key)
+    if summary is None:
+        summary = DailyAttendanceCounter.objects.filter(
+            tenant_id=tenant_id, date=day
+        ).values("present", "absent").first() or {"present": 0, "absent": 0}
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+@transaction.atomic
+def rebuild_counters(tenant_id=None, start=None, end=None):
+    """
+    Recompute counters from raw attendance records.
+
+    Args:
+        tenant_id: Restrict to one tenant (default: all tenants)
+        start, end: Inclusive date bounds (default: unbounded)
+
+    Returns:
+        Number of counter rows written
+    """
+    records = AttendanceRecord.objects.all()
+    counters = DailyAttendanceCounter.objects.all()
+    if tenant_id is not None:
+        records = records.filter(tenant_id=tenant_id)
+        counters = counters.filter(tenant_id=tenant_id)
+    if start is not None:
+        records = records.filter(date__gte=start)
+        counters = counters.filter(date__gte=start)
+    if end is not None:
+        records = records.filter(date__lte=end)
+        counters = counters.filter(date__lte=end)
+
+    totals = (
+        records.order_by()
+        .values("tenant_id", "date")
+        .annotate(**_status_counts())
+    )
+    rows = [DailyAttendanceCounter(**row) for row in totals]
+    DailyAttendanceCounter.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["tenant", "date"],
+        update_fields=["present", "absent", "updated_at"],
+    )
+
+    # Days that no longer have any record
+    rebuilt = {(row.tenant_id, row.date) for row in rows}
+    stale = [
+        (pk, key)
+        for pk, *key in counters.values_list("id", "tenant_id", "date")
+        if tuple(key) not in rebuilt
+    ]
+    if stale:
+        DailyAttendanceCounter.objects.filter(id__in=[pk for pk, _ in stale]).delete()
+
+    for key in rebuilt | {tuple(key) for _, key in stale}:
+        invalidate_summary(*key)
+
+    return len(rows)
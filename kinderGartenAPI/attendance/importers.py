@@ -0,0 +1,199 @@
+"""
+Streaming import of historical attendance.
+
+Files of (child, date, status) rows are read line by line and written in
+fixed-size chunks, so memory use does not depend on the file size. Each chunk
+is validated with one query and written with one set-based statement:
+COPY into a temporary table + INSERT ... ON CONFLICT on PostgreSQL, a batched
+INSERT ... ON CONFLICT elsewhere.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from children.models import Child
+from .counters import rebuild_counters
+from .models import AttendanceRecord, AttendanceStatus
+
+IMPORT_CHUNK_SIZE = 5000
+IMPORT_FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename, default="csv"):
+    """Guess the import format from a file name"""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def iter_rows(lines, fmt):
+    """
+    Yield (line_number, raw_row) pairs from an iterable of text lines.
+    Each raw_row is a dict with child/date/status keys (or None if unparsable).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of {IMPORT_FORMATS}")
+
+
+def parse_row(row):
+    """Return (child_id, date, status) or raise ValueError with a reason"""
+    if row is None:
+        raise ValueError("Unparsable row")
+
+    child_id = row.get("child_id") or row.get("child")
+    try:
+        child_id = int(child_id)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid child id '{child_id}'")
+
+    try:
+        day = parse_date(str(row.get("date") or ""))
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f"Invalid date '{row.get('date')}'")
+    if day > timezone.localdate():
+        raise ValueError("Cannot record attendance for future dates")
+
+    status = row.get("status") or AttendanceStatus.PRESENT
+    if not isinstance(status, str):  # NDJSON values can be of any JSON type
+        raise ValueError(f"Invalid status '{status}'")
+    status = status.strip().lower()
+    if status not in AttendanceStatus.values:
+        raise ValueError(f"Invalid status '{status}'")
+
+    return child_id, day, status
+
+
+def import_attendance(lines, tenant, fmt="csv", chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import attendance rows for a tenant from an iterable of text lines.
+
+    Args:
+        lines: Iterable of text lines (open file, decoded upload, ...)
+        tenant: Tenant owning the records
+        fmt: "csv" (header: child,date,status) or "ndjson"
+        chunk_size: Rows written per set-based statement
+
+    Returns:
+        Dict with imported/rejected counts and the first rejected rows
+    """
+    result = {"imported": 0, "rejected": 0, "errors": []}
+    first_day = last_day = None
+    rows = iter_rows(lines, fmt)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        # Last occurrence wins for duplicate (child, date) pairs in a chunk
+        parsed = {}
+        for line_number, raw in chunk:
+            try:
+                child_id, day, status = parse_row(raw)
+            except ValueError as e:
+                _reject(result, line_number, str(e))
+                continue
+            parsed[(child_id, day)] = (line_number, status)
+
+        valid_ids = set(
+            Child.objects.filter(
+                tenant=tenant, id__in={child_id for child_id, _ in parsed}
+            ).values_list("id", flat=True)
+        )
+        records = []
+        for (child_id, day), (line_number, status) in parsed.items():
+            if child_id not in valid_ids:
+                _reject(result, line_number, f"Child {child_id} not found in tenant")
+                continue
+            records.append((child_id, day, status))
+            first_day = min(first_day or day, day)
+            last_day = max(last_day or day, day)
+
+        if records:
+            with transaction.atomic():
+                _write_chunk(tenant, records)
+            result["imported"] += len(records)
+
+    if first_day:
+        rebuild_counters(tenant_id=tenant.id, start=first_day, end=last_day)
+
+    return result
+
+
+def _reject(result, line_number, error):
+    result["rejected"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append({"line": line_number, "error": error})
+
+
+def _write_chunk(tenant, records):
+    if connection.vendor == "postgresql":
+        _copy_chunk(tenant, records)
+        return
+
+    AttendanceRecord.objects.bulk_create(
+        [
+            AttendanceRecord(tenant=tenant, child_id=child_id, date=day, status=status)
+            for child_id, day, status in records
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["tenant", "child", "date"],
+        update_fields=["status", "updated_at"],
+    )
+
+
+def _copy_chunk(tenant, records):
+    """COPY a chunk into a temp table, then upsert it in one statement"""
+    table = AttendanceRecord._meta.db_table
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(records)
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS attendance_import "
+            "(child_id bigint, date date, status varchar(10)) ON COMMIT DROP"
+        )
+        cursor.execute("TRUNCATE attendance_import")
+        copy_sql = "COPY attendance_import (child_id, date, status) FROM STDIN WITH (FORMAT csv)"
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, "copy_expert"):  # psycopg2
+            raw_cursor.copy_expert(copy_sql, buffer)
+        else:  # psycopg 3
+            with raw_cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (tenant_id, child_id, date, status, created_at, updated_at)
+            SELECT %s, child_id, date, status, now(), now() FROM attendance_import
+            ON CONFLICT (tenant_id, child_id, date)
+            DO UPDATE SET status = EXCLUDED.status, updated_at = EXCLUDED.updated_at
+            """,
+            [tenant.id],
+        )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage monthly partitions of the attendance table (PostgreSQL only): "
+        "convert the table, create upcoming partitions, detach old ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Rebuild the attendance table as a partitioned table (one-off)",
+        )
+        parser.add_argument("--months-ahead", type=int, default=3)
+        parser.add_argument(
+            "--detach-older-than",
+            type=int,
+            default=0,
+            metavar="MONTHS",
+            help="Detach partitions older than N months (0 = keep everything)",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            self.stdout.write("Partitioning requires PostgreSQL; nothing to do.")
+            return
+
+        if options["convert"]:
+            created = partitions.convert_to_partitioned(options["months_ahead"])
+            if created is None:
+                self.stdout.write("Attendance table is already partitioned.")
+            else:
+                self.stdout.write(f"Converted table into {created} monthly partitions.")
+        elif not partitions.is_partitioned():
+            raise CommandError(
+                "Attendance table is not partitioned yet. Run with --convert first."
+            )
+
+        created = partitions.ensure_partitions(options["months_ahead"])
+        detached = partitions.detach_partitions_before(options["detach_older_than"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} partitions, detached {len(detached)}"
+                + (f": {', '.join(detached)}" if detached else "")
+            )
+        )
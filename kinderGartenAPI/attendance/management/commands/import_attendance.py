@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from attendance.importers import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_attendance,
+)
+
+
+class Command(BaseCommand):
+    help = "Import historical attendance (child, date, status) from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (child,date,status header) or NDJSON file")
+        parser.add_argument("--tenant", required=True, help="Tenant slug")
+        parser.add_argument("--format", choices=IMPORT_FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            tenant = Tenant.objects.get(slug=options["tenant"])
+        except Tenant.DoesNotExist:
+            raise CommandError(f"Unknown tenant '{options['tenant']}'")
+
+        fmt = options["format"] or detect_format(options["path"])
+        with open(options["path"], encoding="utf-8-sig", newline="") as handle:
+            result = import_attendance(
+                handle, tenant, fmt=fmt, chunk_size=options["chunk_size"]
+            )
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['imported']} records, rejected {result['rejected']}"
+            )
+        )
@@ -0,0 +1,46 @@
+# Generated migration for per-day attendance counters
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("attendance", "0003_remove_attendancerecord_time"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyAttendanceCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("date", models.DateField()),
+                ("present", models.IntegerField(default=0)),
+                ("absent", models.IntegerField(default=0)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Attendance Counter",
+                "verbose_name_plural": "Daily Attendance Counters",
+                "unique_together": {("tenant", "date")},
+            },
+        ),
+    ]
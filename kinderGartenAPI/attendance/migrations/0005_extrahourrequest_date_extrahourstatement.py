@@ -0,0 +1,87 @@
+# Generated migration for monthly extra hour statements
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_request_dates(apps, schema_editor):
+    """Existing requests were made for the day they were submitted"""
+    connection = schema_editor.connection
+    table = "attendance_extrahourrequest"
+    with connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in connection.introspection.get_table_description(cursor, table)
+        }
+    if "created_at" in columns:
+        if connection.vendor == "sqlite":
+            day = "date(created_at)"  # CAST(... AS date) keeps only the year
+        else:
+            day = "CAST(created_at AS date)"
+        schema_editor.execute(f"UPDATE {table} SET date = {day}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("children", "0013_child_parent_password"),
+        ("core", "0001_initial"),
+        ("attendance", "0004_dailyattendancecounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="extrahourrequest",
+            name="date",
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.RunPython(backfill_request_dates, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="ExtraHourStatement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "month",
+                    models.DateField(help_text="First day of the billed month"),
+                ),
+                ("minutes", models.PositiveIntegerField(default=0)),
+                ("requests_count", models.PositiveIntegerField(default=0)),
+                (
+                    "child",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="extra_hour_statements",
+                        to="children.child",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Extra Hour Statement",
+                "verbose_name_plural": "Extra Hour Statements",
+                "unique_together": {("tenant", "child", "month")},
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "month"], name="attendance__tenant__206a0e_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated migration for extra hour overlap detection
+
+import logging
+
+from django.db import DatabaseError, IntegrityError, migrations, models, transaction
+
+logger = logging.getLogger("api")
+
+CONSTRAINT = "attendance_extrahour_no_overlap"
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    """
+    PostgreSQL only: forbid overlapping (non rejected) requests of a child with
+    a GiST exclusion constraint on the request's time range. Needs btree_gist
+    for the child_id equality; skipped when the extension is not available or
+    the role may not create it (the serializer still checks overlaps).
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'"
+        )
+        if cursor.fetchone() is None:
+            logger.warning("btree_gist unavailable, extra hour overlaps checked in app")
+            return
+
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    except DatabaseError as e:
+        logger.warning(
+            f"btree_gist cannot be created ({e}), extra hour overlaps checked in app"
+        )
+        return
+
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute(
+                f"""
+                ALTER TABLE attendance_extrahourrequest ADD CONSTRAINT {CONSTRAINT}
+                EXCLUDE USING gist (
+                    child_id WITH =,
+                    tsrange(date + start, date + "end") WITH &&
+                ) WHERE (status <> 'rejected' AND "end" > start)
+                """
+            )
+    except IntegrityError:
+        logger.warning(
+            "Existing extra hour requests overlap, exclusion constraint not added"
+        )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"ALTER TABLE attendance_extrahourrequest DROP CONSTRAINT IF EXISTS {CONSTRAINT}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0005_extrahourrequest_date_extrahourstatement"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="extrahourrequest",
+            index=models.Index(
+                fields=["child", "date", "start"], name="attendance__child_i_1ae94a_idx"
+            ),
+        ),
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
@@ -59,6 +59,7 @@ class ExtraHourRequest(BaseTenantModel):
         related_name="extra_hours",
         db_index=True,
     )
+    date = models.DateField(default=timezone.localdate)
     start = models.TimeField()
     end = models.TimeField()
     status = models.CharField(
@@ -73,7 +74,57 @@ class ExtraHourRequest(BaseTenantModel):
         indexes = [
             models.Index(fields=["tenant", "child"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["child", "date", "start"]),  # Overlap checks
         ]
 
     def __str__(self):
         return f"{self.child.name} - {self.start} to {self.end} ({self.status})"
+
+
+class DailyAttendanceCounter(BaseTenantModel):
+    """
+    Present/absent totals for one tenant and one day.
+    Kept up to date on every attendance write (see attendance.counters) so the
+    dashboard summary is a single-row read instead of COUNT queries.
+    """
+
+    date = models.DateField()
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Daily Attendance Counter"
+        verbose_name_plural = "Daily Attendance Counters"
+        unique_together = [["tenant", "date"]]  # One counter row per tenant per day
+
+    def __str__(self):
+        return f"{self.date}: {self.present} present / {self.absent} absent"
+
+
+class ExtraHourStatement(BaseTenantModel):
+    """
+    Approved extra minutes of one child for one month.
+    Generated by attendance.billing so billing reads stored figures instead of
+    summing ExtraHourRequest rows on every request.
+    """
+
+    child = models.ForeignKey(
+        Child,
+        on_delete=models.CASCADE,
+        related_name="extra_hour_statements",
+        db_index=True,
+    )
+    month = models.DateField(help_text="First day of the billed month")
+    minutes = models.PositiveIntegerField(default=0)
+    requests_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Extra Hour Statement"
+        verbose_name_plural = "Extra Hour Statements"
+        unique_together = [["tenant", "child", "month"]]  # One statement per month
+        indexes = [
+            models.Index(fields=["tenant", "month"]),
+        ]
+
+    def __str__(self):
+        return f"{self.child.name} - {self.month:%Y-%m} ({self.minutes} min)"
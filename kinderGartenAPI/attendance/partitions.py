@@ -0,0 +1,205 @@
+"""
+Monthly range partitioning of AttendanceRecord on PostgreSQL.
+
+Partitioning is opt-in: convert_to_partitioned() rebuilds the table as
+PARTITION BY RANGE (date) with one partition per month plus a default
+partition, keeping the existing indexes and constraints. Afterwards
+ensure_partitions() creates upcoming months ahead of time and
+detach_partitions_before() detaches old months into standalone archive tables.
+Date-filtered queries then only scan the partitions of the requested months.
+
+Every function is a no-op on other databases (SQLite keeps a plain table).
+"""
+
+from datetime import date
+import logging
+
+from django.db import connection, transaction
+
+from .models import AttendanceRecord
+
+logger = logging.getLogger("api")
+
+TABLE = AttendanceRecord._meta.db_table
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned():
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table p
+            JOIN pg_class c ON c.oid = p.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def add_months(month, count):
+    """First day of the month `count` months after `month`"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def _create_partition(cursor, month):
+    qn = connection.ops.quote_name
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {qn(partition_name(month))} "
+        f"PARTITION OF {qn(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+        [month, add_months(month, 1)],
+    )
+
+
+def _monthly_partitions(cursor):
+    """Return {first_of_month: partition_name} for attached monthly partitions"""
+    cursor.execute(
+        """
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+        """,
+        [TABLE],
+    )
+    prefix = f"{TABLE}_p"
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        if name.startswith(prefix):
+            year, month = name[len(prefix):].split("_")
+            partitions[date(int(year), int(month), 1)] = name
+    return partitions
+
+
+@transaction.atomic
+def convert_to_partitioned(months_ahead=3):
+    """
+    Rebuild the attendance table as a monthly range-partitioned table.
+
+    Returns:
+        Number of monthly partitions created, or None if nothing was done
+    """
+    if not is_supported() or is_partitioned():
+        return None
+
+    qn = connection.ops.quote_name
+    legacy = f"{TABLE}_legacy"
+    sequence = f"{TABLE}_pid_seq"
+
+    with connection.cursor() as cursor:
+        # Flush deferred FK checks so the legacy table can be dropped
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        # Capture index/constraint definitions to recreate them on the new table
+        cursor.execute(
+            """
+            SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('u', 'f')
+            """,
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE tablename = %s AND indexname NOT IN (
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+            )
+            """,
+            [TABLE, TABLE],
+        )
+        indexes = cursor.fetchall()
+
+        cursor.execute("SELECT min(date), max(date) FROM " + qn(TABLE))
+        first_day, last_day = cursor.fetchone()
+        today = date.today()
+        start = (first_day or today).replace(day=1)
+        end = add_months(max(last_day or today, today).replace(day=1), months_ahead)
+
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE)} (LIKE {qn(legacy)} INCLUDING STORAGE) "
+            f"PARTITION BY RANGE (date)"
+        )
+        # The partition key has to be part of the primary key
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, date)")
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(sequence)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{sequence}')"
+        )
+        cursor.execute(f"ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(TABLE)}.id")
+
+        month, created = start, 0
+        while month <= end:
+            _create_partition(cursor, month)
+            month, created = add_months(month, 1), created + 1
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE + '_default')} PARTITION OF {qn(TABLE)} DEFAULT"
+        )
+
+        cursor.execute(f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(
+            f"SELECT setval('{sequence}', COALESCE((SELECT max(id) FROM {qn(TABLE)}), 0) + 1, false)"
+        )
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        for name, _, definition in constraints:
+            cursor.execute(
+                f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}"
+            )
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+    logger.info(f"Partitioned {TABLE} into {created} monthly partitions")
+    return created
+
+
+def ensure_partitions(months_ahead=3):
+    """Create monthly partitions from the current month up to N months ahead"""
+    if not is_partitioned():
+        return 0
+
+    month = date.today().replace(day=1)
+    with connection.cursor() as cursor:
+        existing = _monthly_partitions(cursor)
+        missing = [
+            add_months(month, offset)
+            for offset in range(months_ahead + 1)
+            if add_months(month, offset) not in existing
+        ]
+        for month in missing:
+            _create_partition(cursor, month)
+    return len(missing)
+
+
+def detach_partitions_before(months):
+    """
+    Detach partitions older than N months. Detached partitions are kept as
+    standalone tables (named like the partition) for archiving or dumping.
+    """
+    if not is_partitioned() or months <= 0:
+        return []
+
+    qn = connection.ops.quote_name
+    cutoff = add_months(date.today().replace(day=1), -months)
+    with connection.cursor() as cursor:
+        old = sorted(
+            name
+            for month, name in _monthly_partitions(cursor).items()
+            if month < cutoff
+        )
+        for name in old:
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+    return old
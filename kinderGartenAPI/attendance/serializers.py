@@ -1,8 +1,15 @@
 # attendance/serializers.py
+from django.utils import timezone
 from rest_framework import serializers
-from .models import AttendanceRecord, ExtraHourRequest
+from core.fieldsets import SparseFieldsetsMixin
+from .models import (
+    AttendanceRecord,
+    ExtraHourRequest,
+    ExtraHourStatement,
+    ExtraHourStatus,
+)
 
-class AttendanceRecordSerializer(serializers.ModelSerializer):
+class AttendanceRecordSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     child_name = serializers.CharField(source="child.name", read_only=True)
 
     class Meta:
@@ -10,9 +17,54 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
         fields = ["id", "child", "child_name", "date", "status"]
 
 
-class ExtraHourRequestSerializer(serializers.ModelSerializer):
+class ExtraHourRequestSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     child_name = serializers.CharField(source="child.name", read_only=True)
 
     class Meta:
         model = ExtraHourRequest
-        fields = ["id", "child", "child_name", "start", "end", "status"]
+        fields = ["id", "child", "child_name", "date", "start", "end", "status"]
+
+    def validate(self, data):
+        """Reject empty intervals and overlaps with the child's other requests"""
+        start = data.get("start", getattr(self.instance, "start", None))
+        end = data.get("end", getattr(self.instance, "end", None))
+        if start and end and end <= start:
+            raise serializers.ValidationError({"end": "End must be after start"})
+
+        child = data.get("child", getattr(self.instance, "child", None))
+        day = (
+            data.get("date")
+            or getattr(self.instance, "date", None)
+            or timezone.localdate()
+        )
+        if child and start and end:
+            # Range seek on the (child, date, start) index
+            overlapping = ExtraHourRequest.objects.filter(
+                child=child,
+                date=day,
+                start__lt=end,
+                end__gt=start,
+            ).exclude(status=ExtraHourStatus.REJECTED)
+            if self.instance is not None:
+                overlapping = overlapping.exclude(pk=self.instance.pk)
+            if overlapping.exists():
+                raise serializers.ValidationError(
+                    "This child already has an extra hour request overlapping this time"
+                )
+        return data
+
+
+class ExtraHourStatementSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    child_name = serializers.CharField(source="child.name", read_only=True)
+
+    class Meta:
+        model = ExtraHourStatement
+        fields = [
+            "id",
+            "child",
+            "child_name",
+            "month",
+            "minutes",
+            "requests_count",
+            "updated_at",
+        ]
@@ -0,0 +1,38 @@
+"""
+Keep DailyAttendanceCounter in sync with single-record attendance writes.
+Bulk writes (bulk_create/update) bypass these signals and recount their day
+through attendance.counters.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .counters import recount_day
+from .models import AttendanceRecord
+
+
+@receiver(pre_save, sender=AttendanceRecord)
+def remember_previous_date(sender, instance, **kwargs):
+    """Stash the stored date so post_save also recounts the day a record left"""
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = (
+            AttendanceRecord.objects.filter(pk=instance.pk)
+            .values_list("date", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def count_saved_attendance(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_date", None)
+    if previous and previous != instance.date:
+        recount_day(instance.tenant_id, previous)
+    recount_day(instance.tenant_id, instance.date)
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def count_deleted_attendance(sender, instance, **kwargs):
+    recount_day(instance.tenant_id, instance.date)
@@ -0,0 +1,97 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from datetime import date, timedelta
+import logging
+
+from . import partitions
+from .billing import generate_statements, month_start
+from .counters import rebuild_counters
+
+logger = logging.getLogger("api")
+
+
+@shared_task
+def reconcile_attendance_counters(days=7):
+    """
+    Rebuild daily attendance counters from raw records for the last N days.
+    Repairs any drift between the counters and AttendanceRecord.
+
+    Args:
+        days: Number of past days to reconcile (default 7)
+    """
+    end = timezone.localdate()
+    start = end - timedelta(days=days)
+
+    logger.info(f"🔁 Reconciling attendance counters from {start} to {end}")
+    try:
+        count = rebuild_counters(start=start, end=end)
+        logger.info(f"✅ Reconciled {count} attendance counters")
+        return count
+    except Exception as e:
+        logger.error(f"❌ Error reconciling attendance counters: {e}", exc_info=True)
+        raise
+
+
+@shared_task
+def maintain_attendance_partitions(months_ahead=3):
+    """
+    Create upcoming monthly attendance partitions and detach the ones older
+    than settings.ATTENDANCE_PARTITION_RETENTION_MONTHS (0 keeps everything).
+    Does nothing unless the attendance table has been partitioned.
+    """
+    if not partitions.is_partitioned():
+        return {"created": 0, "detached": []}
+
+    created = partitions.ensure_partitions(months_ahead)
+    detached = partitions.detach_partitions_before(
+        settings.ATTENDANCE_PARTITION_RETENTION_MONTHS
+    )
+    logger.info(
+        f"🗂️ Attendance partitions: {created} created, {len(detached)} detached"
+    )
+    return {"created": created, "detached": detached}
+
+
+@shared_task
+def generate_extra_hour_statements(months_back=0):
+    """
+    Queue statement generation for every active tenant.
+
+    Args:
+        months_back: 0 refreshes the current month, 1 closes the previous one
+    """
+    from core.models import Tenant
+
+    month = partitions.add_months(month_start(timezone.localdate()), -months_back)
+    tenant_ids = list(
+        Tenant.objects.filter(is_active=True).values_list("id", flat=True)
+    )
+    for tenant_id in tenant_ids:
+        generate_tenant_extra_hour_statements.delay(tenant_id, month.isoformat())
+
+    logger.info(
+        f"🧾 Queued extra hour statements for {len(tenant_ids)} tenants ({month:%Y-%m})"
+    )
+    return len(tenant_ids)
+
+
+@shared_task
+def generate_tenant_extra_hour_statements(tenant_id, month):
+    """
+    Compute the extra hour statements of one tenant for one month.
+
+    Args:
+        tenant_id: Tenant to bill
+        month: ISO date inside the billed month
+    """
+    try:
+        count = generate_statements(tenant_id, date.fromisoformat(month))
+        logger.info(f"✅ Generated {count} extra hour statements for tenant {tenant_id}")
+        return count
+    except Exception as e:
+        logger.error(
+            f"❌ Error generating extra hour statements for tenant {tenant_id}: {e}",
+            exc_info=True,
+        )
+        raise
@@ -1,11 +1,16 @@
 from django.urls import path
 from .views import (
     AttendanceSummaryView,
+    AttendanceAnalyticsView,
+    AttendanceImportView,
+    ClassroomRosterView,
     AttendanceListView,
     AttendanceBulkUpdateView,
     ExtraHourApproveRejectView,
+    ExtraHourBatchActionView,
     ExtraHourCreateView,
     ExtraHourPendingListView,
+    ExtraHourStatementListView,
     ExtraHourRequestCreateView,
     ExtraHourMyRequestsListView,
 )
@@ -13,6 +18,11 @@ from .views import (
 urlpatterns = [
     path("", AttendanceListView.as_view(), name="attendance-list"),
     path("summary/", AttendanceSummaryView.as_view(), name="attendance-summary"),
+    path(
+        "analytics/", AttendanceAnalyticsView.as_view(), name="attendance-analytics"
+    ),
+    path("import/", AttendanceImportView.as_view(), name="attendance-import"),
+    path("roster/", ClassroomRosterView.as_view(), name="attendance-roster"),
     path("update/", AttendanceBulkUpdateView.as_view(), name="attendance-update"),
     path("extra/", ExtraHourPendingListView.as_view(), name="extra-hour-pending"),
     path("extra-hours/", ExtraHourCreateView.as_view(), name="extra-hour-create"),
@@ -21,11 +31,21 @@ urlpatterns = [
         ExtraHourMyRequestsListView.as_view(),
         name="my-extra-hour-requests",
     ),
+    path(
+        "extra/action/",
+        ExtraHourBatchActionView.as_view(),
+        name="extra-hour-batch-action",
+    ),
     path(
         "extra/<int:pk>/action/",
         ExtraHourApproveRejectView.as_view(),
         name="extra-hour-action",
     ),
+    path(
+        "statements/",
+        ExtraHourStatementListView.as_view(),
+        name="extra-hour-statements",
+    ),
     path(
         "extra/request/",
         ExtraHourRequestCreateView.as_view(),
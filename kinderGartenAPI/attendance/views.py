@@ -1,38 +1,54 @@
-from datetime import date
+import codecs
+from datetime import date, timedelta
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FilteredRelation, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 import logging
 
-from .models import AttendanceRecord, ExtraHourRequest
-from .serializers import AttendanceRecordSerializer, ExtraHourRequestSerializer
+from .models import (
+    AttendanceRecord,
+    AttendanceStatus,
+    ExtraHourRequest,
+    ExtraHourStatement,
+    ExtraHourStatus,
+)
+from .counters import get_summary, recount_day
+from .importers import IMPORT_FORMATS, detect_format, import_attendance
+from .serializers import (
+    AttendanceRecordSerializer,
+    ExtraHourRequestSerializer,
+    ExtraHourStatementSerializer,
+)
 from children.models import Child
+from children.scope import get_parent_child_ids
+from core.fieldsets import SparseFieldsetsViewMixin
+from core.images import media_url
 from core.permissions import IsTenantAdmin
 
 logger = logging.getLogger("api")
 
+# Rows per INSERT ... ON CONFLICT statement for bulk attendance writes
+ATTENDANCE_BULK_BATCH_SIZE = 500
+
 
 class AttendanceSummaryView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AttendanceRecordSerializer  # For schema generation
 
     def get(self, request):
-        """Get today's attendance summary"""
-        tenant = request.user.tenant
-        today = date.today()
-
-        total_present = AttendanceRecord.objects.filter(
-            tenant=tenant, date=today, status="present"
-        ).count()
-        total_absent = AttendanceRecord.objects.filter(
-            tenant=tenant, date=today, status="absent"
-        ).count()
+        """Get today's attendance summary from the maintained counters"""
+        summary = get_summary(request.user.tenant_id, date.today())
+        return Response({"present": summary["present"], "absent": summary["absent"]})
 
-        return Response({"present": total_present, "absent": total_absent})
 
-
-class AttendanceListView(generics.ListAPIView):
+class AttendanceListView(SparseFieldsetsViewMixin, generics.ListAPIView):
     serializer_class = AttendanceRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -47,8 +63,59 @@ class AttendanceListView(generics.ListAPIView):
         )  # ✅ FK optimization
 
 
+class ClassroomRosterView(generics.GenericAPIView):
+    """Every child of a classroom with their attendance status for one day"""
+
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = AttendanceRecordSerializer  # For schema generation
+    pagination_class = None
+
+    def get(self, request):
+        """✅ OPTIMIZED: one LEFT JOIN between Child and the day's records"""
+        classroom_id = request.query_params.get(
+            "classroom_id"
+        ) or request.query_params.get("classroom")
+        try:
+            classroom_id = int(classroom_id)
+            day = parse_date(request.query_params.get("date", "")) or date.today()
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "A valid classroom id and YYYY-MM-DD date are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        children = (
+            Child.objects.filter(tenant=request.user.tenant, classroom_id=classroom_id)
+            .annotate(
+                day_attendance=FilteredRelation(
+                    "attendance", condition=Q(attendance__date=day)
+                )
+            )
+            .order_by("name", "id")
+            .values(
+                "id",
+                "name",
+                "avatar",
+                "avatar_variants",
+                status=F("day_attendance__status"),
+            )
+        )
+
+        rows = []
+        for child in children:
+            # ✅ Absolute URLs, like the child serializers (avatar_thumb)
+            thumb = (child.pop("avatar_variants") or {}).get("thumb") or {}
+            child["avatar"] = media_url(child["avatar"], request)
+            child["avatar_thumb"] = {
+                fmt: media_url(path, request) for fmt, path in thumb.items()
+            } or None
+            rows.append(child)
+
+        return Response({"classroom": classroom_id, "date": day, "children": rows})
+
+
 class AttendanceBulkUpdateView(generics.GenericAPIView):
-    """✅ SECURE: Bulk attendance update with validation"""
+    """✅ SECURE: Set-based bulk attendance upsert with per-row validation"""
 
     serializer_class = AttendanceRecordSerializer
     permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
@@ -64,30 +131,60 @@ class AttendanceBulkUpdateView(generics.GenericAPIView):
                 {"error": "No records provided"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        created = []
-        try:
-            for rec_data in records_data:
-                child_id = rec_data.get("child_id") or rec_data.get("child")
-                status_value = rec_data.get("status", "present")
-
-                # ✅ VALIDATE: child belongs to tenant
-                if not Child.objects.filter(id=child_id, tenant=tenant).exists():
-                    return Response(
-                        {"error": f"Child {child_id} not found in your tenant"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                record, _ = AttendanceRecord.objects.update_or_create(
-                    tenant=tenant,
-                    child_id=child_id,
-                    date=today,
-                    defaults={"status": status_value},
+        # Last submitted status wins when the same child appears twice
+        submitted = {}
+        rejected = []
+        for rec_data in records_data:
+            child_id = rec_data.get("child_id") or rec_data.get("child")
+            status_value = rec_data.get("status", AttendanceStatus.PRESENT)
+            try:
+                child_id = int(child_id)
+            except (TypeError, ValueError):
+                rejected.append({"child_id": child_id, "error": "Invalid child id"})
+                continue
+            if status_value not in AttendanceStatus.values:
+                rejected.append(
+                    {"child_id": child_id, "error": f"Invalid status '{status_value}'"}
                 )
-                created.append(record)
+                continue
+            submitted[child_id] = status_value
+
+        # ✅ VALIDATE: every child belongs to tenant, in a single query
+        valid_ids = set(
+            Child.objects.filter(tenant=tenant, id__in=submitted).values_list(
+                "id", flat=True
+            )
+        )
+        for child_id in submitted.keys() - valid_ids:
+            rejected.append(
+                {"child_id": child_id, "error": "Child not found in your tenant"}
+            )
 
-            serializer = self.get_serializer(created, many=True)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        if not valid_ids:
+            return Response(
+                {"error": "No valid records provided", "rejected": rejected},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
+        try:
+            # ✅ One upsert on the (tenant, child, date) unique key
+            AttendanceRecord.objects.bulk_create(
+                [
+                    AttendanceRecord(
+                        tenant=tenant,
+                        child_id=child_id,
+                        date=today,
+                        status=submitted[child_id],
+                    )
+                    for child_id in valid_ids
+                ],
+                batch_size=ATTENDANCE_BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["tenant", "child", "date"],
+                update_fields=["status", "updated_at"],
+            )
+            # ✅ One aggregate under the counter row lock, no stale deltas
+            recount_day(tenant.id, today)
         except Exception as e:
             logger.error(f"Error in bulk attendance update: {e}", exc_info=True)
             return Response(
@@ -95,8 +192,149 @@ class AttendanceBulkUpdateView(generics.GenericAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        records = AttendanceRecord.objects.filter(
+            tenant=tenant, date=today, child_id__in=valid_ids
+        ).select_related("child")
+        serializer = self.get_serializer(records, many=True)
+        return Response(
+            {"records": serializer.data, "rejected": rejected},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AttendanceAnalyticsView(generics.GenericAPIView):
+    """Present/absent counts and rates over a date range, aggregated in the DB"""
+
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = AttendanceRecordSerializer  # For schema generation
+
+    # (model fields, aliased expressions); aliases must not clash with fields
+    GROUPINGS = {
+        "tenant": (("tenant_id",), {}),
+        "classroom": (
+            (),
+            {
+                "classroom_id": F("child__classroom_id"),
+                "classroom_name": F("child__classroom__name"),
+            },
+        ),
+        "child": (("child_id",), {"child_name": F("child__name")}),
+    }
+    MAX_RANGE_DAYS = 400
+
+    def get(self, request):
+        """Aggregate attendance between ?start= and ?end= grouped by ?group_by="""
+        group_by = request.query_params.get("group_by", "classroom")
+        if group_by not in self.GROUPINGS:
+            return Response(
+                {"error": f"Invalid group_by. Must be one of {list(self.GROUPINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        today = date.today()
+        try:
+            end = parse_date(request.query_params.get("end", "")) or today
+            start = parse_date(request.query_params.get("start", "")) or (
+                end - timedelta(days=30)
+            )
+        except ValueError:
+            return Response(
+                {"error": "Dates must use the YYYY-MM-DD format"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start > end or (end - start).days > self.MAX_RANGE_DAYS:
+            return Response(
+                {
+                    "error": f"start must be before end and the range at most {self.MAX_RANGE_DAYS} days"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fields, expressions = self.GROUPINGS[group_by]
+        rows = (
+            AttendanceRecord.objects.filter(
+                tenant=request.user.tenant, date__range=(start, end)
+            )
+            .order_by()
+            .values(*fields, **expressions)
+            .annotate(
+                present=Count("id", filter=Q(status=AttendanceStatus.PRESENT)),
+                absent=Count("id", filter=Q(status=AttendanceStatus.ABSENT)),
+                total=Count("id"),
+            )
+            .annotate(
+                rate=Cast("present", FloatField()) / Cast("total", FloatField())
+            )
+            .order_by(*fields, *expressions)
+        )
 
-class ExtraHourPendingListView(generics.ListAPIView):
+        results = [{**row, "rate": round(row["rate"], 4)} for row in rows]
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "group_by": group_by,
+                "results": results,
+            }
+        )
+
+
+class AttendanceImportView(generics.GenericAPIView):
+    """Import historical attendance from a CSV or NDJSON upload"""
+
+    parser_classes = [MultiPartParser, FormParser]
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = AttendanceRecordSerializer  # For schema generation
+
+    def post(self, request):
+        file_obj = request.FILES.get("file")
+        if not file_obj:
+            return Response(
+                {"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fmt = request.data.get("format") or detect_format(file_obj.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"Invalid format. Must be one of {list(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Decode lazily: the upload is consumed line by line, never loaded whole.
+            # A decoding error mid-file rolls back the chunks already written.
+            with transaction.atomic():
+                lines = codecs.iterdecode(file_obj, "utf-8-sig")
+                result = import_attendance(lines, request.user.tenant, fmt=fmt)
+        except UnicodeDecodeError:
+            return Response(
+                {"error": "File must be UTF-8 encoded, nothing was imported"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        logger.info(
+            f"Attendance import by {request.user.username}: "
+            f"{result['imported']} imported, {result['rejected']} rejected"
+        )
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+def save_extra_hour_request(serializer, tenant):
+    """
+    Save a new pending request. The serializer already rejects overlaps; on
+    PostgreSQL the exclusion constraint also catches concurrent submissions.
+    """
+    try:
+        with transaction.atomic():
+            serializer.save(tenant=tenant, status=ExtraHourStatus.PENDING)
+    except IntegrityError as e:
+        logger.warning(f"Overlapping extra hour request rejected: {e}")
+        raise ValidationError(
+            "This child already has an extra hour request overlapping this time"
+        )
+
+
+class ExtraHourPendingListView(SparseFieldsetsViewMixin, generics.ListAPIView):
     serializer_class = ExtraHourRequestSerializer
     permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
 
@@ -115,8 +353,7 @@ class ExtraHourCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        tenant = self.request.user.tenant
-        serializer.save(tenant=tenant, status="pending")
+        save_extra_hour_request(serializer, self.request.user.tenant)
 
 
 class ExtraHourApproveRejectView(generics.GenericAPIView):
@@ -143,6 +380,57 @@ class ExtraHourApproveRejectView(generics.GenericAPIView):
         return Response({"success": True, "status": req.status})
 
 
+class ExtraHourBatchActionView(generics.GenericAPIView):
+    """Approve or reject many pending extra hour requests in one call"""
+
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = ExtraHourRequestSerializer  # For schema generation
+
+    MAX_BATCH_SIZE = 500
+
+    @transaction.atomic
+    def post(self, request):
+        action = request.data.get("action")
+        ids = request.data.get("ids")
+
+        if action not in [ExtraHourStatus.APPROVED, ExtraHourStatus.REJECTED]:
+            return Response(
+                {"error": "Invalid action. Must be 'approved' or 'rejected'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # A string would be iterated per character ("123" -> 1, 2, 3)
+        valid = isinstance(ids, list) and all(
+            (isinstance(pk, int) and not isinstance(pk, bool))
+            or (isinstance(pk, str) and pk.isdecimal())
+            for pk in ids
+        )
+        ids = list(dict.fromkeys(int(pk) for pk in ids)) if valid else []
+        if not ids or len(ids) > self.MAX_BATCH_SIZE:
+            return Response(
+                {
+                    "error": f"ids must be a list of 1 to {self.MAX_BATCH_SIZE} request ids"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # ✅ Only rows still pending transition; locking them first means a
+        # concurrent decision either wins entirely or sees them as decided
+        pending = ExtraHourRequest.objects.filter(
+            tenant=request.user.tenant, id__in=ids, status=ExtraHourStatus.PENDING
+        )
+        locked_ids = set(pending.select_for_update().values_list("id", flat=True))
+        updated = pending.filter(id__in=locked_ids).update(
+            status=action, updated_at=timezone.now()
+        )
+
+        skipped = [pk for pk in ids if pk not in locked_ids]
+        logger.info(
+            f"{updated} extra hour requests {action} by {request.user.username}"
+            f" ({len(skipped)} skipped)"
+        )
+        return Response({"updated": updated, "status": action, "skipped": skipped})
+
+
 class ExtraHourRequestCreateView(generics.CreateAPIView):
     """Alternative endpoint for creating extra hour requests"""
 
@@ -150,11 +438,10 @@ class ExtraHourRequestCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        tenant = self.request.user.tenant
-        serializer.save(tenant=tenant, status="pending")
+        save_extra_hour_request(serializer, self.request.user.tenant)
 
 
-class ExtraHourMyRequestsListView(generics.ListAPIView):
+class ExtraHourMyRequestsListView(SparseFieldsetsViewMixin, generics.ListAPIView):
     """Parents can view their own extra hour requests and their status"""
 
     serializer_class = ExtraHourRequestSerializer
@@ -162,17 +449,46 @@ class ExtraHourMyRequestsListView(generics.ListAPIView):
 
     def get_queryset(self):
         """Get extra hour requests for the current parent's children"""
-        from children.models import Child
-
-        tenant = self.request.user.tenant
         user = self.request.user
 
-        # Get all children associated with this parent
-        children = Child.objects.filter(tenant=tenant, parent_user=user)
-
-        # Get all extra hour requests for those children
+        # Children come from the cached parent scope, no join on parent_user
         return (
-            ExtraHourRequest.objects.filter(tenant=tenant, child__in=children)
+            ExtraHourRequest.objects.filter(
+                tenant=user.tenant, child_id__in=get_parent_child_ids(user)
+            )
             .select_related("child")
             .order_by("-created_at")
         )
+
+
+class ExtraHourStatementListView(SparseFieldsetsViewMixin, generics.ListAPIView):
+    """
+    Monthly extra hour statements (?month=YYYY-MM, default current month).
+    Admins see every child of the tenant, parents only their own children.
+    """
+
+    serializer_class = ExtraHourStatementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        month = request.query_params.get("month")
+        try:
+            self.month = parse_date(f"{month}-01") if month else None
+        except ValueError:
+            self.month = None
+        if month and self.month is None:
+            return Response(
+                {"error": "month must use the YYYY-MM format"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        self.month = self.month or timezone.localdate().replace(day=1)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = ExtraHourStatement.objects.filter(
+            tenant=user.tenant, month=self.month
+        )
+        if user.role != "admin":
+            queryset = queryset.filter(child_id__in=get_parent_child_ids(user))
+        return queryset.select_related("child").order_by("child__name")
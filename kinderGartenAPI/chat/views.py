@@ -7,6 +7,7 @@ import logging
 
 from .models import Conversation, Message
 from .serializers import ConversationSerializer, MessageSerializer
+from core.pagination import KeysetPagination
 from core.permissions import IsTenantMember
 
 User = get_user_model()
@@ -17,6 +18,7 @@ logger = logging.getLogger("api")
 class ConversationListCreateView(generics.ListCreateAPIView):
     serializer_class = ConversationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination  # ✅ (-created_at, id) cursors, no OFFSET
 
     def get_queryset(self):
         """✅ TENANT-SAFE: Filter by tenant and user role"""
@@ -24,13 +26,10 @@ class ConversationListCreateView(generics.ListCreateAPIView):
         tenant = user.tenant
 
         if user.role == "admin":
-            return Conversation.objects.filter(tenant=tenant).select_related(
-                "parent", "admin"
-            )
+            queryset = Conversation.objects.filter(tenant=tenant)
         else:
-            return Conversation.objects.filter(
-                tenant=tenant, parent=user
-            ).select_related("parent", "admin")
+            queryset = Conversation.objects.filter(tenant=tenant, parent=user)
+        return queryset.select_related("parent", "admin").order_by("-created_at")
 
     def post(self, request, *args, **kwargs):
         """When a parent opens chat, create or get conversation with first admin"""
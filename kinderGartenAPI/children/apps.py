@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """SQLite table rebuilds drop the FTS triggers, reinstall them if needed"""
+    from django.db import connections
+
+    from .search import FTS_TABLE, install_search_index
+
+    connection = connections[using]
+    if FTS_TABLE in connection.introspection.table_names():
+        install_search_index(connection)
 
 
 class ChildrenConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'children'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(ensure_search_index, sender=self)
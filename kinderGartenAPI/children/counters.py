@@ -0,0 +1,80 @@
+"""
+Denormalized ClassRoom.students_count.
+
+Single child writes adjust the counts through children.signals. Bulk writes
+(bulk_create, queryset update/delete) bypass the signals and must call
+adjust_students_counts() with their own deltas. rebuild_students_counts()
+recomputes counts from Child rows when they drift (reconcile_classroom_counts).
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Child, ClassRoom
+
+
+def classroom_deltas(previous, current):
+    """
+    Compute {classroom_id: delta} between two {child_id: classroom_id} maps.
+    Children missing from `previous` are new, missing from `current` removed.
+    """
+    deltas = Counter()
+    for child_id, classroom_id in previous.items():
+        if current.get(child_id) != classroom_id:
+            deltas[classroom_id] -= 1
+    for child_id, classroom_id in current.items():
+        if previous.get(child_id) != classroom_id:
+            deltas[classroom_id] += 1
+    return {pk: delta for pk, delta in deltas.items() if pk and delta}
+
+
+def adjust_students_counts(deltas):
+    """Atomically apply {classroom_id: delta}, one UPDATE per distinct delta"""
+    by_delta = defaultdict(list)
+    for classroom_id, delta in deltas.items():
+        if classroom_id and delta:
+            by_delta[delta].append(classroom_id)
+
+    for delta, classroom_ids in by_delta.items():
+        ClassRoom.objects.filter(pk__in=classroom_ids).update(
+            students_count=Greatest(F("students_count") + delta, Value(0)),
+            updated_at=timezone.now(),
+        )
+
+
+@transaction.atomic
+def rebuild_students_counts(tenant_id=None):
+    """
+    Recompute students_count from Child rows.
+
+    Returns:
+        Ids of the classrooms whose stored count was wrong
+    """
+    actual = Coalesce(
+        Subquery(
+            Child.objects.filter(classroom=OuterRef("pk"))
+            .order_by()
+            .values("classroom")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+    classrooms = ClassRoom.objects.all()
+    if tenant_id is not None:
+        classrooms = classrooms.filter(tenant_id=tenant_id)
+
+    drifted = list(
+        classrooms.annotate(actual=actual)
+        .filter(~Q(students_count=F("actual")))
+        .values_list("id", flat=True)
+    )
+    if drifted:
+        ClassRoom.objects.filter(pk__in=drifted).update(
+            students_count=actual, updated_at=timezone.now()
+        )
+    return drifted
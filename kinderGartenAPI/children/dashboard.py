@@ -0,0 +1,122 @@
+"""
+Admin dashboard: per-classroom figures for one day in a single query.
+
+Every figure is a correlated COUNT subquery annotated on the tenant's
+classrooms (children counts come from the maintained
+ClassRoom.students_count), so the screen costs one query instead of one
+request per classroom and figure. The result is cached per tenant and day
+for DASHBOARD_CACHE_TIMEOUT seconds; figures may lag writes by that much.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from attendance.models import (
+    AttendanceRecord,
+    AttendanceStatus,
+    ExtraHourRequest,
+    ExtraHourStatus,
+)
+from planning.models import Event
+from reports.models import DailyReport
+from .models import ClassRoom
+
+DASHBOARD_CACHE_TIMEOUT = 60  # 1 minute
+UPCOMING_EVENT_DAYS = 7
+
+
+def dashboard_cache_key(tenant_id, day):
+    return f"children:dashboard:{tenant_id}:{day.isoformat()}"
+
+
+def _count(queryset, classroom_field="child__classroom", **conditions):
+    """COUNT(*) of `queryset` rows of the outer classroom, 0 when none"""
+    counts = (
+        queryset.filter(**{classroom_field: OuterRef("pk")})
+        .order_by()
+        .values(classroom_field)
+        .annotate(n=Count("pk", filter=Q(**conditions) if conditions else None))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def build_dashboard(tenant_id, day):
+    """Return the dashboard rows of a tenant's classrooms for `day`"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    attendance = AttendanceRecord.objects.filter(tenant_id=tenant_id, date=day)
+    classrooms = (
+        ClassRoom.objects.filter(tenant_id=tenant_id)
+        .annotate(
+            present=_count(attendance, status=AttendanceStatus.PRESENT),
+            absent=_count(attendance, status=AttendanceStatus.ABSENT),
+            pending_extra_hours=_count(
+                ExtraHourRequest.objects.filter(
+                    tenant_id=tenant_id, status=ExtraHourStatus.PENDING
+                )
+            ),
+            reports_submitted=_count(
+                DailyReport.objects.filter(tenant_id=tenant_id, date=day)
+            ),
+            upcoming_events=_count(
+                Event.objects.filter(
+                    tenant_id=tenant_id,
+                    date__gte=start,
+                    date__lt=start + timedelta(days=UPCOMING_EVENT_DAYS),
+                ),
+                classroom_field="classroom",
+            ),
+        )
+        .order_by("name", "id")
+        .values(
+            "id",
+            "name",
+            "students_count",
+            "present",
+            "absent",
+            "pending_extra_hours",
+            "reports_submitted",
+            "upcoming_events",
+        )
+    )
+
+    rows = []
+    for row in classrooms:
+        students = row["students_count"]
+        rows.append(
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "children_count": students,
+                "attendance": {
+                    "present": row["present"],
+                    "absent": row["absent"],
+                    "unmarked": max(students - row["present"] - row["absent"], 0),
+                },
+                "pending_extra_hours": row["pending_extra_hours"],
+                "reports": {
+                    "submitted": row["reports_submitted"],
+                    "pending": max(students - row["reports_submitted"], 0),
+                },
+                "upcoming_events": row["upcoming_events"],
+            }
+        )
+    return rows
+
+
+def get_dashboard(tenant_id, day=None):
+    """Return {"date", "classrooms"} for a tenant from cache or one query"""
+    day = day or timezone.localdate()
+    key = dashboard_cache_key(tenant_id, day)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = {
+            "date": day.isoformat(),
+            "classrooms": build_dashboard(tenant_id, day),
+        }
+        cache.set(key, dashboard, DASHBOARD_CACHE_TIMEOUT)
+    return dashboard
@@ -0,0 +1,305 @@
+"""
+Bulk child enrollment from CSV or XLSX files.
+
+One header row, then one child per row:
+
+    name, parent_name (required)
+    birthdate (YYYY-MM-DD), gender, classroom (name or id),
+    clubs (names separated by ";"), has_mobile_app (yes/true/1),
+    allergies, conditions, medication, doctor,
+    emergency_contact_name, emergency_contact_relation, emergency_contact_phone,
+    responsible_name, responsible_phone
+
+Classrooms, clubs and taken usernames are each resolved with one query
+(usernames need another one per round of collisions, and are allocated again
+if a concurrent signup takes one before the INSERT). Parent account
+passwords are hashed in a process pool, then users, children and club links
+are written with one bulk_create each. Every row is checked with
+Child.full_clean() first (lengths, types), so invalid rows are reported and
+skipped while the valid ones are imported.
+"""
+
+import codecs
+import csv
+import os
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.crypto import get_random_string
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
+
+from .counters import adjust_students_counts
+from .models import Child, ClassRoom, Club
+
+User = get_user_model()
+
+ENROLLMENT_FORMATS = ("csv", "xlsx")
+MAX_ENROLLMENT_ROWS = 2000
+USERNAME_ATTEMPTS = 3
+PARENT_PASSWORD_CHARS = "ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnpqrstuvwxyz23456789"
+TEXT_FIELDS = (
+    "parent_name",
+    "gender",
+    "allergies",
+    "conditions",
+    "medication",
+    "doctor",
+    "emergency_contact_name",
+    "emergency_contact_relation",
+    "emergency_contact_phone",
+    "responsible_name",
+    "responsible_phone",
+)
+TRUE_VALUES = {"1", "true", "yes", "oui", "y"}
+# Set by enroll_children (relations) or already resolved by _parse_row
+CLEAN_EXCLUDE = ["tenant", "classroom", "parent_user", "clubs"]
+
+
+class EnrollmentError(ValueError):
+    """The file cannot be imported (format, encoding, size, username clashes)"""
+
+
+def detect_format(filename, default="csv"):
+    name = (filename or "").lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        return "xlsx"
+    return "csv" if name.endswith(".csv") else default
+
+
+def read_rows(file_obj, fmt):
+    """Return a list of {column: text} dicts (header names lower-cased)"""
+    if fmt == "csv":
+        try:
+            reader = csv.DictReader(codecs.iterdecode(file_obj, "utf-8-sig"))
+            rows = list(islice(reader, MAX_ENROLLMENT_ROWS + 1))
+        except UnicodeDecodeError:
+            raise EnrollmentError("File must be UTF-8 encoded")
+    elif fmt == "xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise EnrollmentError("XLSX import requires openpyxl, use a CSV file")
+        try:
+            sheet = load_workbook(file_obj, read_only=True, data_only=True).active
+        except Exception:
+            raise EnrollmentError("Unreadable XLSX file")
+        values = sheet.iter_rows(values_only=True)
+        header = [str(cell or "").strip() for cell in next(values, [])]
+        rows = list(
+            islice(
+                (dict(zip(header, row)) for row in values if any(row)),
+                MAX_ENROLLMENT_ROWS + 1,
+            )
+        )
+    else:
+        raise EnrollmentError(
+            f"Unsupported format '{fmt}'. Use one of {ENROLLMENT_FORMATS}"
+        )
+
+    # Stop reading one row past the limit instead of loading the whole file
+    if len(rows) > MAX_ENROLLMENT_ROWS:
+        raise EnrollmentError(f"At most {MAX_ENROLLMENT_ROWS} rows per import")
+    return [
+        {
+            str(key).strip().lower(): "" if value is None else str(value).strip()
+            for key, value in row.items()
+            if key
+        }
+        for row in rows
+    ]
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password() for many passwords, spread over a process pool"""
+    workers = workers or settings.ENROLLMENT_HASH_WORKERS or os.cpu_count()
+    if workers <= 1 or len(passwords) < 2 * workers:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def allocate_usernames(names):
+    """
+    Unique username per name (slug, or slug_xyz if taken). Candidates are
+    checked with one username__in query per round; only the ones that
+    collided get a new suffix and go to the next round.
+    """
+    bases = [slugify(name) or "parent" for name in names]
+    usernames = list(bases)
+    taken, claimed = set(), set()
+    pending = range(len(bases))
+    while pending:
+        taken.update(
+            User.objects.filter(
+                username__in={usernames[i] for i in pending}
+            ).values_list("username", flat=True)
+        )
+        retry = []
+        for i in pending:
+            if usernames[i] in taken or usernames[i] in claimed:
+                usernames[i] = f"{bases[i]}_{get_random_string(3).lower()}"
+                retry.append(i)
+            else:
+                claimed.add(usernames[i])
+        pending = retry
+    return usernames
+
+
+def create_parent_users(tenant, names, hashed_passwords):
+    """
+    bulk_create parent accounts named after the children. A username taken by
+    a concurrent signup between allocation and INSERT rolls back the savepoint
+    and the usernames are allocated again.
+    """
+    for _ in range(USERNAME_ATTEMPTS):
+        usernames = allocate_usernames(names)
+        try:
+            with transaction.atomic():
+                return User.objects.bulk_create(
+                    [
+                        User(
+                            username=username,
+                            password=hashed,
+                            tenant=tenant,
+                            first_name=name,
+                            role="parent",
+                        )
+                        for username, hashed, name in zip(
+                            usernames, hashed_passwords, names
+                        )
+                    ]
+                )
+        except IntegrityError:
+            continue
+    raise EnrollmentError("Parent usernames kept colliding, retry the import")
+
+
+def _lookup(queryset):
+    """Map lower-cased names and string ids to primary keys"""
+    mapping = {}
+    for pk, name in queryset.values_list("id", "name"):
+        mapping[str(pk)] = pk
+        mapping.setdefault(name.strip().lower(), pk)
+    return mapping
+
+
+def _parse_row(raw, classrooms, clubs):
+    """Return (child fields, club ids, wants account) or raise ValueError"""
+    errors = []
+    name = raw.get("name", "")
+    if not name:
+        errors.append("name is required")
+    if not raw.get("parent_name"):
+        errors.append("parent_name is required")
+
+    fields = {"name": name}
+    fields.update({field: raw[field] for field in TEXT_FIELDS if raw.get(field)})
+
+    if raw.get("birthdate"):
+        try:
+            birthdate = parse_date(raw["birthdate"][:10])
+        except ValueError:
+            birthdate = None
+        if birthdate is None:
+            errors.append(f"Invalid birthdate '{raw['birthdate']}'")
+        fields["birthdate"] = birthdate
+
+    classroom = raw.get("classroom", "")
+    if classroom:
+        fields["classroom_id"] = classrooms.get(classroom.lower())
+        if fields["classroom_id"] is None:
+            errors.append(f"Unknown classroom '{classroom}'")
+
+    club_ids = []
+    for club in filter(None, (c.strip() for c in raw.get("clubs", "").split(";"))):
+        if club.lower() not in clubs:
+            errors.append(f"Unknown club '{club}'")
+        club_ids.append(clubs.get(club.lower()))
+
+    # Model validation without queries: relations and uniqueness are skipped,
+    # missing names are already reported above
+    exclude = CLEAN_EXCLUDE + [
+        field for field in ("name", "parent_name") if not fields.get(field)
+    ]
+    try:
+        Child(**fields).full_clean(
+            exclude=exclude, validate_unique=False, validate_constraints=False
+        )
+    except ValidationError as e:
+        errors += [
+            f"{field}: {message}"
+            for field, messages in e.message_dict.items()
+            for message in messages
+        ]
+
+    if errors:
+        raise ValueError(errors)
+    return fields, club_ids, raw.get("has_mobile_app", "").lower() in TRUE_VALUES
+
+
+@transaction.atomic
+def enroll_children(rows, tenant):
+    """
+    Create children (and parent accounts when has_mobile_app is set).
+
+    Returns:
+        Dict with created/rejected counts and a per-row report; created rows
+        carry the child id and the generated parent credentials
+    """
+    classrooms = _lookup(ClassRoom.objects.filter(tenant=tenant))
+    clubs = _lookup(Club.objects.filter(tenant=tenant))
+
+    report, valid = [], []
+    for number, raw in enumerate(rows, start=2):  # Row 1 is the header
+        try:
+            fields, club_ids, wants_account = _parse_row(raw, classrooms, clubs)
+        except ValueError as e:
+            report.append({"row": number, "status": "error", "errors": e.args[0]})
+            continue
+        entry = {"row": number, "status": "created"}
+        report.append(entry)
+        valid.append((entry, fields, club_ids, wants_account))
+
+    # ✅ Parent accounts: usernames in one query, hashes in parallel, one INSERT
+    account_rows = [row for row in valid if row[3]]
+    passwords = [
+        get_random_string(8, allowed_chars=PARENT_PASSWORD_CHARS) for _ in account_rows
+    ]
+    users = create_parent_users(
+        tenant,
+        [fields["name"] for _, fields, _, _ in account_rows],
+        hash_passwords(passwords),
+    )
+    for (entry, fields, _, _), user, password in zip(account_rows, users, passwords):
+        fields.update(parent_user=user, parent_password=password, has_mobile_app=True)
+        entry.update(username=user.username, password=password)
+
+    children = Child.objects.bulk_create(
+        [Child(tenant=tenant, **fields) for _, fields, _, _ in valid]
+    )
+    Child.clubs.through.objects.bulk_create(
+        [
+            Child.clubs.through(child_id=child.id, club_id=club_id)
+            for child, (_, _, club_ids, _) in zip(children, valid)
+            for club_id in set(club_ids)
+        ]
+    )
+    # bulk_create bypasses the signals maintaining students_count
+    adjust_students_counts(Counter(child.classroom_id for child in children))
+
+    for child, (entry, _, _, _) in zip(children, valid):
+        entry["child_id"] = child.id
+
+    return {
+        "created": len(children),
+        "rejected": len(report) - len(children),
+        "rows": report,
+    }
@@ -0,0 +1,323 @@
+"""
+Growth measurements and percentiles.
+
+Measurements are recorded in batches (a classroom's weigh-in day) with one
+upsert per set of submitted values (weight, height or both), so a value left
+out keeps the stored one, and Child.weight / Child.height are moved to the
+latest values.
+
+Percentiles use the LMS method of the WHO Child Growth Standards: with the
+reference L, M, S at the child's age (linearly interpolated between table
+ages),
+
+    z = ((X / M) ** L - 1) / (L * S)        (log(X / M) / S when L == 0)
+
+and the percentile is the standard normal CDF of z. A classroom is computed
+in one NumPy pass per curve (indicator and sex) over all its children. The
+result is cached under a key derived from the classroom's children and
+measurements, so a new measurement batch (or any child change) gets fresh
+figures and repeated reads do not recompute.
+"""
+
+import csv
+import hashlib
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import JSONObject
+from django.utils import timezone
+
+from .models import Child, GrowthIndicator, GrowthMeasurement, GrowthReference
+
+GROWTH_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day, keys change with the data
+REFERENCE_CACHE_KEY = "children:growth-reference"
+DAYS_PER_MONTH = 30.4375
+
+INDICATOR_FIELDS = {
+    GrowthIndicator.WEIGHT_FOR_AGE: "weight",
+    GrowthIndicator.HEIGHT_FOR_AGE: "height",
+}
+MALE = {"m", "male", "boy", "garçon", "garcon", "h", "homme"}
+FEMALE = {"f", "female", "girl", "fille"}
+
+
+def sex_code(gender):
+    """"M", "F" or None from the free-text Child.gender"""
+    gender = (gender or "").strip().lower()
+    if gender in MALE:
+        return "M"
+    if gender in FEMALE:
+        return "F"
+    return None
+
+
+def merge_entries(entries):
+    """
+    One entry per (child, measured_on): an upsert cannot touch a row twice.
+    Later values win, values left out of a later entry are kept.
+    """
+    merged = {}
+    for entry in entries:
+        key = (entry["child"].id, entry["measured_on"])
+        values = {field: value for field, value in entry.items() if value is not None}
+        merged.setdefault(key, {}).update(values)
+    return list(merged.values())
+
+
+def record_measurements(tenant, entries):
+    """
+    Upsert measurements ({"child", "measured_on", "weight", "height"}), then
+    copy the latest values onto the children.
+
+    Returns:
+        Number of measurements written (repeated child and day count once)
+    """
+    now = timezone.now()
+    entries = merge_entries(entries)
+    by_fields = defaultdict(list)
+    for entry in entries:
+        fields = tuple(field for field in ("weight", "height") if field in entry)
+        by_fields[fields].append(entry)
+    for fields, group in by_fields.items():
+        # Only the submitted values are overwritten on existing rows
+        GrowthMeasurement.objects.bulk_create(
+            [GrowthMeasurement(tenant=tenant, **entry) for entry in group],
+            update_conflicts=True,
+            unique_fields=["tenant", "child", "measured_on"],
+            update_fields=[*fields, "updated_at"],
+        )
+
+    latest = {}
+    for entry in sorted(entries, key=lambda entry: entry["measured_on"]):
+        latest[entry["child"].id] = entry
+    children = (
+        Child.objects.filter(id__in=latest)
+        .annotate(last_measured=Max("measurements__measured_on"))
+        .only("id", "weight", "height")
+    )
+    changed = []
+    for child in children:
+        entry = latest[child.id]
+        if entry["measured_on"] < child.last_measured:
+            continue  # Backfilled history, the child has newer values
+        for field in ("weight", "height"):
+            if entry.get(field) is not None:
+                setattr(child, field, entry[field])
+        child.updated_at = now
+        changed.append(child)
+    # bulk_update skips the Child signals, none of them watch these fields
+    Child.objects.bulk_update(changed, ["weight", "height", "updated_at"])
+    return len(entries)
+
+
+@transaction.atomic
+def load_reference(handle, indicator, sex):
+    """
+    Replace one reference curve from an LMS table as published by the WHO
+    (tab or comma separated, a "Day" or "Month" column then L, M, S).
+
+    Returns:
+        Number of rows loaded
+    """
+    sample = handle.read(4096)
+    handle.seek(0)
+    delimiter = "\t" if "\t" in sample else ","
+    reader = csv.DictReader(handle, delimiter=delimiter)
+    header = {name.strip().lower(): name for name in reader.fieldnames or []}
+    if not {"l", "m", "s"} <= set(header) or not {"day", "month"} & set(header):
+        raise ValueError("Expected a Day or Month column and L, M, S columns")
+    age_column = header.get("day") or header["month"]
+    days_per_unit = 1 if "day" in header else DAYS_PER_MONTH
+
+    rows = []
+    for line, row in enumerate(reader, start=2):
+        try:
+            rows.append(
+                GrowthReference(
+                    indicator=indicator,
+                    sex=sex,
+                    age_days=round(float(row[age_column]) * days_per_unit),
+                    l=float(row[header["l"]]),
+                    m=float(row[header["m"]]),
+                    s=float(row[header["s"]]),
+                )
+            )
+        except (TypeError, ValueError):
+            raise ValueError(f"line {line}: L, M, S and age must be numbers")
+    if not rows:
+        raise ValueError("The table is empty")
+
+    GrowthReference.objects.filter(indicator=indicator, sex=sex).delete()
+    GrowthReference.objects.bulk_create(rows, batch_size=1000)
+    cache.delete(REFERENCE_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(REFERENCE_CACHE_KEY))
+    return len(rows)
+
+
+def normal_cdf(z):
+    """
+    Standard normal CDF of an array, via the erf approximation of Abramowitz
+    and Stegun (7.1.26, absolute error < 1.5e-7). NaN stays NaN.
+    """
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (
+        0.254829592
+        + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429)))
+    )
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def lms_zscores(values, power, median, variation):
+    """z-scores of measurements against interpolated L, M, S arrays"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = values / median
+        log_case = np.abs(power) < 1e-7
+        power = np.where(log_case, 1.0, power)
+        return np.where(
+            log_case,
+            np.log(ratio) / variation,
+            (np.power(ratio, power) - 1) / (power * variation),
+        )
+
+
+def reference_curves():
+    """
+    Return (version, {(indicator, sex): (ages, L, M, S)}) from cache or one
+    query. load_growth_reference drops the cache entry.
+    """
+    cached = cache.get(REFERENCE_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    rows = {}
+    for indicator, sex, *lms in GrowthReference.objects.order_by(
+        "indicator", "sex", "age_days"
+    ).values_list("indicator", "sex", "age_days", "l", "m", "s"):
+        rows.setdefault((indicator, sex), []).append(lms)
+    curves = {
+        key: tuple(np.array(column, dtype=float) for column in zip(*values))
+        for key, values in rows.items()
+    }
+    digest = hashlib.md5()
+    for key in sorted(curves):
+        digest.update(repr(key).encode())
+        for column in curves[key]:
+            digest.update(column.tobytes())
+    cached = (digest.hexdigest(), curves)
+    cache.set(REFERENCE_CACHE_KEY, cached, GROWTH_CACHE_TIMEOUT)
+    return cached
+
+
+def compute_percentiles(sexes, ages, measurements, curves):
+    """
+    Vectorized z-scores and percentiles.
+
+    Args:
+        sexes: array of "M" / "F" / "" per child
+        ages: age in days per child (NaN if unknown)
+        measurements: {indicator: values per child (NaN if missing)}
+        curves: {(indicator, sex): (ages, L, M, S)}
+
+    Returns:
+        {indicator: (z, percentile)} arrays, NaN where it cannot be computed
+    """
+    results = {}
+    for indicator, values in measurements.items():
+        z = np.full(len(ages), np.nan)
+        for sex in ("M", "F"):
+            curve = curves.get((indicator, sex))
+            if curve is None:
+                continue
+            ref_ages, *lms = curve
+            rows = (sexes == sex) & (ages >= ref_ages[0]) & (ages <= ref_ages[-1])
+            z[rows] = lms_zscores(
+                values[rows], *(np.interp(ages[rows], ref_ages, p) for p in lms)
+            )
+        results[indicator] = (z, normal_cdf(z) * 100)
+    return results
+
+
+def _rounded(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def classroom_growth(classroom_id):
+    """Latest measurement and percentiles of every child of a classroom"""
+    children = Child.objects.filter(classroom_id=classroom_id)
+    stamp = children.aggregate(
+        children_count=Count("id", distinct=True),
+        children_changed=Max("updated_at"),
+        measurement_count=Count("measurements", distinct=True),
+        measurements_changed=Max("measurements__updated_at"),
+    )
+    version, curves = reference_curves()
+    digest = hashlib.md5(f"{sorted(stamp.items())}|{version}".encode()).hexdigest()
+    key = f"children:growth:{classroom_id}:{digest}"
+    growth = cache.get(key)
+    if growth is not None:
+        return growth
+
+    latest = (
+        GrowthMeasurement.objects.filter(child=OuterRef("pk"))
+        .order_by("-measured_on")
+        .values(
+            json=JSONObject(
+                measured_on="measured_on", weight="weight", height="height"
+            )
+        )[:1]
+    )
+    rows = list(
+        children.annotate(latest=Subquery(latest))
+        .order_by("name", "id")
+        .values("id", "name", "gender", "birthdate", "latest")
+    )
+
+    def number(row, field):
+        value = (row["latest"] or {}).get(field)
+        return np.nan if value is None else float(value)
+
+    measured_on = [
+        date.fromisoformat(row["latest"]["measured_on"])
+        if row["latest"]
+        else None
+        for row in rows
+    ]
+    ages = np.array(
+        [
+            (day - row["birthdate"]).days if day and row["birthdate"] else np.nan
+            for row, day in zip(rows, measured_on)
+        ],
+        dtype=float,
+    )
+    sexes = np.array([sex_code(row["gender"]) or "" for row in rows])
+    measurements = {
+        indicator: np.array([number(row, field) for row in rows], dtype=float)
+        for indicator, field in INDICATOR_FIELDS.items()
+    }
+    results = compute_percentiles(sexes, ages, measurements, curves)
+
+    growth = []
+    for i, (row, day) in enumerate(zip(rows, measured_on)):
+        entry = {
+            "id": row["id"],
+            "name": row["name"],
+            "measured_on": day.isoformat() if day else None,
+            "age_months": _rounded(ages[i] / DAYS_PER_MONTH, 1),
+            "weight": _rounded(measurements[GrowthIndicator.WEIGHT_FOR_AGE][i], 2),
+            "height": _rounded(measurements[GrowthIndicator.HEIGHT_FOR_AGE][i], 2),
+        }
+        for indicator, (z, percentile) in results.items():
+            entry[str(indicator)] = {
+                "z": _rounded(z[i], 2),
+                "percentile": _rounded(percentile[i], 1),
+            }
+        growth.append(entry)
+
+    cache.set(key, growth, GROWTH_CACHE_TIMEOUT)
+    return growth
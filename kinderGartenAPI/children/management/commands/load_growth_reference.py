@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from children.growth import load_reference
+from children.models import GrowthIndicator
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a growth reference curve from an LMS table, e.g. the WHO Child "
+        "Growth Standards expanded tables (who.int/tools/child-growth-standards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Table with a Day or Month column and L, M, S")
+        parser.add_argument(
+            "--indicator", required=True, choices=GrowthIndicator.values
+        )
+        parser.add_argument("--sex", required=True, choices=["M", "F"])
+
+    def handle(self, *args, **options):
+        with open(options["path"], encoding="utf-8-sig", newline="") as handle:
+            try:
+                count = load_reference(handle, options["indicator"], options["sex"])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {count} {options['indicator']} rows for sex {options['sex']}"
+            )
+        )
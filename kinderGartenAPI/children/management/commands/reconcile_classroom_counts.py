@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from children.counters import rebuild_students_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute ClassRoom.students_count from the children actually assigned"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", help="Tenant slug (default: all tenants)")
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        if options["tenant"]:
+            try:
+                tenant_id = Tenant.objects.get(slug=options["tenant"]).id
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Unknown tenant '{options['tenant']}'")
+
+        drifted = rebuild_students_counts(tenant_id=tenant_id)
+        self.stdout.write(
+            self.style.SUCCESS(f"Fixed students_count of {len(drifted)} classrooms")
+        )
@@ -0,0 +1,47 @@
+"""
+Bulk club membership edits.
+
+Adding or removing many children writes the Child.clubs through table
+directly: one SELECT of the affected links, one bulk INSERT and one DELETE,
+instead of rewriting each child's whole clubs set. Edits are idempotent:
+adding a member or removing a non-member is a no-op and left out of the
+returned diff.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Child, Club
+
+Membership = Child.clubs.through
+
+
+@transaction.atomic
+def update_club_members(club, add=(), remove=()):
+    """
+    Add and remove children (ids) of a club.
+
+    Returns:
+        {"added": [ids], "removed": [ids]}, the memberships actually changed
+    """
+    links = Membership.objects.filter(club_id=club.id)
+    current = set(
+        links.filter(child_id__in={*add, *remove}).values_list("child_id", flat=True)
+    )
+    added = sorted(set(add) - current)
+    removed = sorted(set(remove) & current)
+
+    if added:
+        Membership.objects.bulk_create(
+            [Membership(club_id=club.id, child_id=child_id) for child_id in added],
+            ignore_conflicts=True,  # Added concurrently, same result
+        )
+    if removed:
+        links.filter(child_id__in=removed).delete()
+    if added or removed:
+        # Conditional GETs on children and clubs are built from updated_at
+        now = timezone.now()
+        Child.objects.filter(id__in=added + removed).update(updated_at=now)
+        Club.objects.filter(pk=club.pk).update(updated_at=now)
+
+    return {"added": added, "removed": removed}
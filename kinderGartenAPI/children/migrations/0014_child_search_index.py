@@ -0,0 +1,97 @@
+# Generated migration for indexed child search
+
+import logging
+
+from django.db import OperationalError, migrations
+
+logger = logging.getLogger("api")
+
+# Frozen copy of the DDL children.search installed when this migration was
+# written; that module can change without changing what this migration does.
+COLUMNS = "name, parent_name, responsible_name, emergency_contact_name"
+NEW_VALUES = (
+    "new.name, new.parent_name, new.responsible_name, new.emergency_contact_name"
+)
+OLD_VALUES = (
+    "old.name, old.parent_name, old.responsible_name, old.emergency_contact_name"
+)
+
+SQLITE_FTS_TABLE = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS children_child_fts USING fts5(
+        {COLUMNS}, content='children_child', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+SQLITE_TRIGGERS = {
+    "children_child_fts_ai": f"""
+        AFTER INSERT ON children_child BEGIN
+            INSERT INTO children_child_fts (rowid, {COLUMNS})
+            VALUES (new.id, {NEW_VALUES});
+        END""",
+    "children_child_fts_ad": f"""
+        AFTER DELETE ON children_child BEGIN
+            INSERT INTO children_child_fts (children_child_fts, rowid, {COLUMNS})
+            VALUES ('delete', old.id, {OLD_VALUES});
+        END""",
+    "children_child_fts_au": f"""
+        AFTER UPDATE OF {COLUMNS} ON children_child BEGIN
+            INSERT INTO children_child_fts (children_child_fts, rowid, {COLUMNS})
+            VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO children_child_fts (rowid, {COLUMNS})
+            VALUES (new.id, {NEW_VALUES});
+        END""",
+}
+TRIGRAM_FIELDS = ("name", "parent_name", "responsible_name", "emergency_contact_name")
+
+
+def install(apps, schema_editor):
+    """FTS5 table and triggers on SQLite, trigram indexes on PostgreSQL"""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute(SQLITE_FTS_TABLE)
+            except OperationalError as e:
+                logger.warning(f"SQLite FTS5 unavailable, child search unindexed: {e}")
+                return
+            for trigger, body in SQLITE_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger} {body}")
+            cursor.execute(
+                "INSERT INTO children_child_fts (children_child_fts) VALUES ('rebuild')"
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+            )
+            if cursor.fetchone() is None:
+                logger.warning("pg_trgm unavailable, child search unindexed")
+                return
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in TRIGRAM_FIELDS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS children_child_{field}_trgm "
+                    f"ON children_child USING gin (UPPER({field}::text) gin_trgm_ops)"
+                )
+
+
+def uninstall(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute("DROP TABLE IF EXISTS children_child_fts")
+        elif connection.vendor == "postgresql":
+            for field in TRIGRAM_FIELDS:
+                cursor.execute(f"DROP INDEX IF EXISTS children_child_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("children", "0013_child_parent_password"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
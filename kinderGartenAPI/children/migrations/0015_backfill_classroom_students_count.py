@@ -0,0 +1,34 @@
+# Generated migration to initialize denormalized classroom counts
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_students_count(apps, schema_editor):
+    """students_count was never maintained before, compute it once"""
+    ClassRoom = apps.get_model("children", "ClassRoom")
+    Child = apps.get_model("children", "Child")
+    ClassRoom.objects.update(
+        students_count=Coalesce(
+            Subquery(
+                Child.objects.filter(classroom=OuterRef("pk"))
+                .order_by()
+                .values("classroom")
+                .annotate(total=Count("id"))
+                .values("total")
+            ),
+            Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("children", "0014_child_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_students_count, migrations.RunPython.noop),
+    ]
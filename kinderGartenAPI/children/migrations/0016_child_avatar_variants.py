@@ -0,0 +1,20 @@
+# Generated migration for resized avatar variants
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("children", "0015_backfill_classroom_students_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="child",
+            name="avatar_variants",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="Resized copies, see core.images"
+            ),
+        ),
+    ]
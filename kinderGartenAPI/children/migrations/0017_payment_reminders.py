@@ -0,0 +1,66 @@
+# Generated migration for payments due and payment reminders
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("children", "0016_child_avatar_variants"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="child",
+            index=models.Index(
+                fields=["tenant", "next_payment_date"],
+                name="children_ch_tenant__de70b2_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PaymentReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("due_date", models.DateField()),
+                (
+                    "notified",
+                    models.BooleanField(
+                        default=False,
+                        help_text="A chat message reached the parent account",
+                    ),
+                ),
+                (
+                    "child",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payment_reminders",
+                        to="children.child",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payment Reminder",
+                "verbose_name_plural": "Payment Reminders",
+                "unique_together": {("tenant", "child", "due_date")},
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated migration for structured club sessions
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("children", "0017_payment_reminders"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClubSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Monday"),
+                            (1, "Tuesday"),
+                            (2, "Wednesday"),
+                            (3, "Thursday"),
+                            (4, "Friday"),
+                            (5, "Saturday"),
+                            (6, "Sunday"),
+                        ]
+                    ),
+                ),
+                ("start_time", models.TimeField()),
+                ("end_time", models.TimeField()),
+                ("room", models.CharField(blank=True, default="", max_length=40)),
+                (
+                    "club",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sessions",
+                        to="children.club",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Club Session",
+                "verbose_name_plural": "Club Sessions",
+                "ordering": ["weekday", "start_time"],
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "weekday", "start_time", "end_time"],
+                        name="children_cl_tenant__79b2a6_idx",
+                    )
+                ],
+            },
+        ),
+    ]
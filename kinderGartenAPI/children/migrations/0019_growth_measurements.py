@@ -0,0 +1,108 @@
+# Generated migration for growth measurement history and reference curves
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("children", "0018_clubsession"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GrowthMeasurement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "measured_on",
+                    models.DateField(default=django.utils.timezone.localdate),
+                ),
+                (
+                    "weight",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=5, null=True
+                    ),
+                ),
+                (
+                    "height",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=5, null=True
+                    ),
+                ),
+                (
+                    "child",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="measurements",
+                        to="children.child",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Growth Measurement",
+                "verbose_name_plural": "Growth Measurements",
+                "ordering": ["-measured_on"],
+                "unique_together": {("tenant", "child", "measured_on")},
+            },
+        ),
+        migrations.CreateModel(
+            name="GrowthReference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "indicator",
+                    models.CharField(
+                        choices=[
+                            ("weight_for_age", "Weight for age"),
+                            ("height_for_age", "Length/height for age"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "sex",
+                    models.CharField(
+                        choices=[("M", "Male"), ("F", "Female")], max_length=1
+                    ),
+                ),
+                ("age_days", models.PositiveIntegerField()),
+                ("l", models.FloatField(verbose_name="L (Box-Cox power)")),
+                ("m", models.FloatField(verbose_name="M (median)")),
+                ("s", models.FloatField(verbose_name="S (coefficient of variation)")),
+            ],
+            options={
+                "verbose_name": "Growth Reference",
+                "verbose_name_plural": "Growth References",
+                "unique_together": {("indicator", "sex", "age_days")},
+            },
+        ),
+    ]
@@ -3,6 +3,7 @@ from core.models import BaseTenantModel
 from datetime import date
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -49,6 +50,50 @@ class Club(BaseTenantModel):
         return self.name
 
 
+class Weekday(models.IntegerChoices):
+    """ISO weekday - 1, as returned by date.weekday()"""
+
+    MONDAY = 0, "Monday"
+    TUESDAY = 1, "Tuesday"
+    WEDNESDAY = 2, "Wednesday"
+    THURSDAY = 3, "Thursday"
+    FRIDAY = 4, "Friday"
+    SATURDAY = 5, "Saturday"
+    SUNDAY = 6, "Sunday"
+
+
+class ClubSession(BaseTenantModel):
+    """A weekly recurring club meeting (Club.schedule is display text only)"""
+
+    club = models.ForeignKey(
+        Club,
+        on_delete=models.CASCADE,
+        related_name="sessions",
+        db_index=True,
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    room = models.CharField(max_length=40, blank=True, default="")
+
+    class Meta:
+        verbose_name = "Club Session"
+        verbose_name_plural = "Club Sessions"
+        ordering = ["weekday", "start_time"]
+        indexes = [
+            # "Which sessions run at T": tenant + weekday, range on start_time
+            models.Index(fields=["tenant", "weekday", "start_time", "end_time"]),
+        ]
+
+    def clean(self):
+        """Validate before save"""
+        if self.end_time <= self.start_time:
+            raise ValidationError("A session must end after it starts")
+
+    def __str__(self):
+        return f"{self.club.name} - {self.get_weekday_display()} {self.start_time}"
+
+
 class Child(BaseTenantModel):
     name = models.CharField(max_length=120)
     birthdate = models.DateField(null=True, blank=True)
@@ -62,6 +107,9 @@ class Child(BaseTenantModel):
     )
     parent_name = models.CharField(max_length=120)
     avatar = models.CharField(max_length=500, blank=True, default="")
+    avatar_variants = models.JSONField(
+        default=dict, blank=True, help_text="Resized copies, see core.images"
+    )
     clubs = models.ManyToManyField(
         "Club", related_name="children", blank=True, verbose_name="Clubs"
     )
@@ -105,7 +153,88 @@ class Child(BaseTenantModel):
             models.Index(fields=["tenant", "classroom"]),
             models.Index(fields=["tenant", "parent_user"]),
             models.Index(fields=["parent_user"]),
+            models.Index(fields=["tenant", "next_payment_date"]),  # Payments due
         ]
 
     def __str__(self):
         return self.name
+
+
+class GrowthMeasurement(BaseTenantModel):
+    """
+    Weight (kg) and height (cm) history of a child, one row per day.
+    Child.weight and Child.height keep the latest values (children.growth).
+    """
+
+    child = models.ForeignKey(
+        Child,
+        on_delete=models.CASCADE,
+        related_name="measurements",
+        db_index=True,
+    )
+    measured_on = models.DateField(default=timezone.localdate)
+    weight = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    height = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Growth Measurement"
+        verbose_name_plural = "Growth Measurements"
+        ordering = ["-measured_on"]
+        unique_together = [["tenant", "child", "measured_on"]]  # One per day
+
+    def __str__(self):
+        return f"{self.child.name} - {self.measured_on}"
+
+
+class GrowthIndicator(models.TextChoices):
+    WEIGHT_FOR_AGE = "weight_for_age", "Weight for age"
+    HEIGHT_FOR_AGE = "height_for_age", "Length/height for age"
+
+
+class GrowthReference(models.Model):
+    """
+    LMS parameters of a growth reference curve (e.g. WHO Child Growth
+    Standards) by sex and age, shared by all tenants. Loaded from the
+    published tables with `manage.py load_growth_reference`.
+    """
+
+    indicator = models.CharField(max_length=20, choices=GrowthIndicator.choices)
+    sex = models.CharField(max_length=1, choices=[("M", "Male"), ("F", "Female")])
+    age_days = models.PositiveIntegerField()
+    l = models.FloatField(verbose_name="L (Box-Cox power)")  # noqa: E741
+    m = models.FloatField(verbose_name="M (median)")
+    s = models.FloatField(verbose_name="S (coefficient of variation)")
+
+    class Meta:
+        verbose_name = "Growth Reference"
+        verbose_name_plural = "Growth References"
+        unique_together = [["indicator", "sex", "age_days"]]
+
+    def __str__(self):
+        return f"{self.indicator} {self.sex} day {self.age_days}"
+
+
+class PaymentReminder(BaseTenantModel):
+    """
+    One reminder per child and due date (children.payments), so the daily
+    reminder job never reminds twice for the same payment.
+    """
+
+    child = models.ForeignKey(
+        Child,
+        on_delete=models.CASCADE,
+        related_name="payment_reminders",
+        db_index=True,
+    )
+    due_date = models.DateField()
+    notified = models.BooleanField(
+        default=False, help_text="A chat message reached the parent account"
+    )
+
+    class Meta:
+        verbose_name = "Payment Reminder"
+        verbose_name_plural = "Payment Reminders"
+        unique_together = [["tenant", "child", "due_date"]]  # Once per payment
+
+    def __str__(self):
+        return f"{self.child.name} - {self.due_date}"
@@ -0,0 +1,131 @@
+"""
+Payments due, read from Child.next_payment_date.
+
+due_children() is a single range query on the (tenant, next_payment_date)
+index. remind_tenant() runs daily for each active tenant, one Celery task per
+tenant (children.tasks): it loads the children due within the window in one
+query, skips those already reminded for that due date (PaymentReminder
+ledger), and writes the reminders in batches: one bulk INSERT each for ledger
+rows, missing parent/admin conversations and chat messages. Children without
+a parent account only get a ledger row, listed as not notified.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from chat.models import Conversation, Message
+from core.models import Tenant
+from .models import Child, PaymentReminder
+
+User = get_user_model()
+
+MAX_PAYMENT_DUE_DAYS = 90
+REMINDER_BATCH_SIZE = 500
+REMINDER_TEXT = "Reminder: the next payment for {name} is due on {date:%d/%m/%Y}."
+
+
+def due_children(tenant_id, until, since=None):
+    """Children of a tenant whose next payment is due by `until` (and since)"""
+    children = Child.objects.filter(tenant_id=tenant_id, next_payment_date__lte=until)
+    if since is not None:
+        children = children.filter(next_payment_date__gte=since)
+    return children.order_by("next_payment_date", "id")
+
+
+def _batches(items, size=REMINDER_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@transaction.atomic
+def remind_tenant(tenant_id, today, days):
+    """Remind the parents of a tenant's children due within `days`, once each"""
+    due = list(
+        due_children(tenant_id, today + timedelta(days=days), since=today).values(
+            "id", "name", "parent_user_id", "next_payment_date"
+        )
+    )
+    if not due:
+        return 0
+
+    reminded = set(
+        PaymentReminder.objects.filter(
+            tenant_id=tenant_id, child_id__in=[child["id"] for child in due]
+        ).values_list("child_id", "due_date")
+    )
+    due = [
+        child
+        for child in due
+        if (child["id"], child["next_payment_date"]) not in reminded
+    ]
+    admin_id = (
+        User.objects.filter(tenant_id=tenant_id, role="admin")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+    for batch in _batches(due):
+        parents = {child["parent_user_id"] for child in batch} - {None}
+        conversations = {}
+        if admin_id and parents:
+            Conversation.objects.bulk_create(
+                [
+                    Conversation(
+                        tenant_id=tenant_id, parent_id=parent_id, admin_id=admin_id
+                    )
+                    for parent_id in parents
+                ],
+                ignore_conflicts=True,  # Existing conversations are reused
+            )
+            conversations = dict(
+                Conversation.objects.filter(
+                    tenant_id=tenant_id, admin_id=admin_id, parent_id__in=parents
+                ).values_list("parent_id", "id")
+            )
+
+        Message.objects.bulk_create(
+            [
+                Message(
+                    tenant_id=tenant_id,
+                    conversation_id=conversations[child["parent_user_id"]],
+                    sender_id=admin_id,
+                    text=REMINDER_TEXT.format(
+                        name=child["name"], date=child["next_payment_date"]
+                    ),
+                )
+                for child in batch
+                if child["parent_user_id"] in conversations
+            ]
+        )
+        PaymentReminder.objects.bulk_create(
+            [
+                PaymentReminder(
+                    tenant_id=tenant_id,
+                    child_id=child["id"],
+                    due_date=child["next_payment_date"],
+                    notified=child["parent_user_id"] in conversations,
+                )
+                for child in batch
+            ],
+            ignore_conflicts=True,
+        )
+    return len(due)
+
+
+def send_payment_reminders(days=3, today=None):
+    """
+    Remind every active tenant's parents of payments due within `days`, in
+    this process (the daily task queues one remind_tenant() per tenant)
+    """
+    today = today or timezone.localdate()
+    sent = {}
+    for tenant_id in Tenant.objects.filter(is_active=True).values_list(
+        "id", flat=True
+    ):
+        count = remind_tenant(tenant_id, today, days)
+        if count:
+            sent[tenant_id] = count
+    return sent
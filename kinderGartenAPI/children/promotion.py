@@ -0,0 +1,77 @@
+"""
+End-of-year classroom promotion.
+
+A mapping {from classroom id: to classroom id or None (leaving)} moves every
+child of each source classroom at once. The children of all source
+classrooms are read first, in one query, so chained mappings (1 -> 2, 2 -> 3)
+move each child exactly once; then every mapping is one UPDATE on those ids
+and students_count is adjusted with the resulting deltas
+(children.counters). A dry run returns the same diff without writing.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import adjust_students_counts
+from .models import Child, ClassRoom
+
+
+class PromotionError(ValueError):
+    """The mapping cannot be applied (unknown classrooms, self mappings)"""
+
+
+def _validate(tenant_id, mapping):
+    if any(source == target for source, target in mapping.items()):
+        raise PromotionError("A classroom cannot be promoted into itself.")
+    referenced = set(mapping) | {target for target in mapping.values() if target}
+    known = set(
+        ClassRoom.objects.filter(tenant_id=tenant_id, pk__in=referenced).values_list(
+            "id", flat=True
+        )
+    )
+    unknown = sorted(referenced - known)
+    if unknown:
+        raise PromotionError(f"Unknown classrooms: {unknown}")
+
+
+@transaction.atomic
+def promote_classrooms(tenant_id, mapping, dry_run=False):
+    """
+    Move the children of each source classroom to its target.
+
+    Returns:
+        [{"from": id, "to": id or None, "children": [ids]}] in mapping order
+    """
+    _validate(tenant_id, mapping)
+
+    children = Child.objects.filter(tenant_id=tenant_id, classroom_id__in=mapping)
+    if not dry_run:
+        children = children.select_for_update()
+    by_classroom = defaultdict(list)
+    for child_id, classroom_id in children.order_by("id").values_list(
+        "id", "classroom_id"
+    ):
+        by_classroom[classroom_id].append(child_id)
+
+    moves = [
+        {"from": source, "to": target, "children": by_classroom[source]}
+        for source, target in mapping.items()
+    ]
+    if dry_run:
+        return moves
+
+    now = timezone.now()
+    deltas = defaultdict(int)
+    for move in moves:
+        if not move["children"]:
+            continue
+        Child.objects.filter(pk__in=move["children"]).update(
+            classroom_id=move["to"], updated_at=now
+        )
+        deltas[move["from"]] -= len(move["children"])
+        deltas[move["to"]] += len(move["children"])
+    # Queryset updates bypass the signals maintaining students_count
+    adjust_students_counts(deltas)
+    return moves
@@ -0,0 +1,49 @@
+"""
+Parent scope: the ids of the children linked to a parent account.
+
+Parent-facing views and object permissions read the ids from a per-user cache
+entry instead of joining on Child.parent_user on every request. The entry is
+dropped whenever a child's parent_user changes (children.signals) and when
+mobile app access is enabled or disabled. Queryset .update() calls on
+parent_user bypass the signals and must call invalidate_parent_scope().
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Child
+
+PARENT_SCOPE_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def parent_scope_cache_key(user_id):
+    return f"children:parent-scope:{user_id}"
+
+
+def get_parent_child_ids(user):
+    """Return the sorted ids of the children linked to a parent user"""
+    key = parent_scope_cache_key(user.id)
+    child_ids = cache.get(key)
+    if child_ids is None:
+        child_ids = list(
+            Child.objects.filter(tenant_id=user.tenant_id, parent_user_id=user.id)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        cache.set(key, child_ids, PARENT_SCOPE_CACHE_TIMEOUT)
+    return child_ids
+
+
+def filter_for_parent(queryset, user, field="id"):
+    """Restrict a queryset to the parent's children (no-op for other roles)"""
+    if user.role != "parent":
+        return queryset
+    return queryset.filter(**{f"{field}__in": get_parent_child_ids(user)})
+
+
+def invalidate_parent_scope(*user_ids):
+    """Drop cached scopes now and again once the transaction commits"""
+    keys = [parent_scope_cache_key(user_id) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,214 @@
+"""
+Indexed name search over children.
+
+Searched columns: name, parent_name, responsible_name, emergency_contact_name.
+
+- PostgreSQL: GIN trigram indexes on UPPER(column) serve the ILIKE filters
+  Django generates for __icontains; results are ranked by trigram word
+  similarity. Needs the pg_trgm extension.
+- SQLite: an external-content FTS5 table kept in sync with children_child by
+  triggers; prefix queries ranked by bm25.
+- Anything else (or a missing extension): plain icontains filters ranked by
+  where the term matched.
+
+Migration 0014 creates the index with a frozen copy of this DDL.
+install_search_index() is idempotent and runs again after every migrate,
+since SQLite table rebuilds drop the FTS triggers.
+"""
+
+import logging
+import re
+from functools import lru_cache, reduce
+from operator import and_, or_
+
+from django.db import OperationalError, connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger("api")
+
+SEARCH_FIELDS = (
+    "name",
+    "parent_name",
+    "responsible_name",
+    "emergency_contact_name",
+)
+TABLE = "children_child"
+FTS_TABLE = "children_child_fts"
+MAX_TERMS = 5
+
+TERM_RE = re.compile(r"\w+")
+
+_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, {{columns}})
+            VALUES (new.id, {{new_values}});
+        END""",
+    f"{FTS_TABLE}_ad": f"""
+        AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {{columns}})
+            VALUES ('delete', old.id, {{old_values}});
+        END""",
+    f"{FTS_TABLE}_au": f"""
+        AFTER UPDATE OF {{columns}} ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {{columns}})
+            VALUES ('delete', old.id, {{old_values}});
+            INSERT INTO {FTS_TABLE} (rowid, {{columns}})
+            VALUES (new.id, {{new_values}});
+        END""",
+}
+
+
+def install_search_index(connection):
+    """Create the search index of the connection's database if supported"""
+    if TABLE not in connection.introspection.table_names():
+        return
+    if connection.vendor == "sqlite":
+        _install_sqlite_fts(connection)
+    elif connection.vendor == "postgresql":
+        _install_trigram_indexes(connection)
+
+
+def uninstall_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for trigger in _TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == "postgresql":
+            for field in SEARCH_FIELDS:
+                cursor.execute(f"DROP INDEX IF EXISTS {TABLE}_{field}_trgm")
+    _has_search_index.cache_clear()
+
+
+def _install_sqlite_fts(connection):
+    columns = ", ".join(SEARCH_FIELDS)
+    new_values = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+    old_values = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)"
+            % ", ".join("%s" for _ in _TRIGGERS),
+            list(_TRIGGERS),
+        )
+        if len(cursor.fetchall()) == len(_TRIGGERS):
+            return  # Already installed and in sync
+
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{columns}, content='{TABLE}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, child search unindexed: {e}")
+            return
+
+        for trigger, body in _TRIGGERS.items():
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {trigger} "
+                + body.format(
+                    columns=columns, new_values=new_values, old_values=old_values
+                )
+            )
+        # Triggers were missing, so the index may be stale
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    _has_search_index.cache_clear()
+
+
+def _install_trigram_indexes(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning("pg_trgm unavailable, child search unindexed")
+            return
+
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for field in SEARCH_FIELDS:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TABLE}_{field}_trgm ON {TABLE} "
+                f"USING gin (UPPER({field}::text) gin_trgm_ops)"
+            )
+    _has_search_index.cache_clear()
+
+
+def has_search_index(connection):
+    return _has_search_index(connection.alias, connection.vendor)
+
+
+@lru_cache(maxsize=None)
+def _has_search_index(alias, vendor):
+    """Checked once per process; cleared when the index is (re)installed"""
+    with connections[alias].cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE name = %s OR name IN (%s)"
+                % ("%s", ", ".join("%s" for _ in _TRIGGERS)),
+                [FTS_TABLE, *_TRIGGERS],
+            )
+            return cursor.fetchone()[0] == len(_TRIGGERS) + 1
+        if vendor == "postgresql":
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            return cursor.fetchone() is not None
+    return False
+
+
+def search_children(queryset, query):
+    """
+    Filter and rank a Child queryset by a free-text query.
+    Every term must match (as a prefix on SQLite, a substring elsewhere) one
+    of the searched columns. Rows are annotated with `rank` (higher is better).
+    """
+    terms = TERM_RE.findall(query or "")[:MAX_TERMS]
+    if not terms:
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+
+    connection = connections[queryset.db]
+    if has_search_index(connection):
+        if connection.vendor == "sqlite":
+            return _fts_search(queryset, terms)
+        if connection.vendor == "postgresql":
+            return _trigram_search(queryset, terms, query)
+    return _contains_search(queryset, terms)
+
+
+def _contains_filter(terms):
+    return reduce(
+        and_,
+        (
+            reduce(or_, [Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS])
+            for term in terms
+        ),
+    )
+
+
+def _fts_search(queryset, terms):
+    match = " ".join(f'"{term}"*' for term in terms)
+    matching = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+    rank = (
+        f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id"
+    )
+    return queryset.filter(id__in=RawSQL(matching, [match])).annotate(
+        rank=RawSQL(rank, [match], output_field=FloatField())
+    )
+
+
+def _trigram_search(queryset, terms, query):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+    from django.db.models.functions import Greatest
+
+    rank = Greatest(*[TrigramWordSimilarity(query, field) for field in SEARCH_FIELDS])
+    return queryset.filter(_contains_filter(terms)).annotate(rank=rank)
+
+
+def _contains_search(queryset, terms):
+    rank = Case(
+        When(name__istartswith=terms[0], then=Value(3.0)),
+        When(name__icontains=terms[0], then=Value(2.0)),
+        default=Value(1.0),
+        output_field=FloatField(),
+    )
+    return queryset.filter(_contains_filter(terms)).annotate(rank=rank)
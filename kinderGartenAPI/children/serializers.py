@@ -1,6 +1,9 @@
+from django.utils import timezone
 from rest_framework import serializers
+from core.fields import ImageVariantsField, TenantPrimaryKeyRelatedField
+from core.fieldsets import SparseFieldsetsMixin
 from django.contrib.auth import get_user_model
-from children.models import Child, Club
+from children.models import Child, Club, ClubSession, GrowthMeasurement
 from .models import ClassRoom
 
 User = get_user_model()
@@ -9,7 +12,7 @@ User = get_user_model()
 # -----------------------------------------------------------
 # 🏫 CLASSROOM SERIALIZER
 # -----------------------------------------------------------
-class ClassRoomSerializer(serializers.ModelSerializer):
+class ClassRoomSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = ClassRoom
         fields = [
@@ -21,23 +24,117 @@ class ClassRoomSerializer(serializers.ModelSerializer):
             "room",
             "students_count",
         ]
-        read_only_fields = ["tenant"]
+        read_only_fields = ["tenant", "students_count"]
+
+    def update(self, instance, validated_data):
+        """Save only the edited fields, students_count is maintained in the DB"""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+
+class ClassRoomPromotionSerializer(serializers.Serializer):
+    """{"mapping": {"<from id>": <to id or null>}, "dry_run": false}"""
+
+    mapping = serializers.DictField(
+        child=serializers.IntegerField(allow_null=True), allow_empty=False
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_mapping(self, value):
+        try:
+            return {int(source): target for source, target in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("Keys must be classroom ids.")
 
 
 # -----------------------------------------------------------
 # 🎨 CLUB SERIALIZER
 # -----------------------------------------------------------
-class ClubSerializer(serializers.ModelSerializer):
+class ClubSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Club
         fields = "__all__"
         read_only_fields = ["tenant"]
 
 
+class ClubSessionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    club = TenantPrimaryKeyRelatedField(queryset=Club.objects.all())
+    club_name = serializers.CharField(source="club.name", read_only=True)
+
+    class Meta:
+        model = ClubSession
+        fields = [
+            "id",
+            "club",
+            "club_name",
+            "weekday",
+            "start_time",
+            "end_time",
+            "room",
+        ]
+        read_only_fields = ["tenant"]
+
+    def validate(self, attrs):
+        start = attrs.get("start_time", getattr(self.instance, "start_time", None))
+        end = attrs.get("end_time", getattr(self.instance, "end_time", None))
+        if start and end and end <= start:
+            raise serializers.ValidationError(
+                {"end_time": "A session must end after it starts."}
+            )
+        return attrs
+
+
+class GrowthMeasurementListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        """✅ Resolve the children of every row with one query"""
+        if isinstance(data, list):
+            self.child.fields["child"].prefetch(
+                row.get("child") for row in data if isinstance(row, dict)
+            )
+        return super().to_internal_value(data)
+
+
+class GrowthMeasurementSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    child = TenantPrimaryKeyRelatedField(queryset=Child.objects.only("id"))
+
+    class Meta:
+        model = GrowthMeasurement
+        list_serializer_class = GrowthMeasurementListSerializer
+        fields = ["id", "child", "measured_on", "weight", "height"]
+        read_only_fields = ["tenant"]
+
+    def validate(self, attrs):
+        if attrs.get("weight") is None and attrs.get("height") is None:
+            raise serializers.ValidationError("Provide a weight or a height.")
+        return attrs
+
+
+class ClubMembersSerializer(serializers.Serializer):
+    """Children (ids) to add to and remove from a club"""
+
+    add = TenantPrimaryKeyRelatedField(
+        queryset=Child.objects.only("id"), many=True, required=False
+    )
+    remove = TenantPrimaryKeyRelatedField(
+        queryset=Child.objects.only("id"), many=True, required=False
+    )
+
+    def validate(self, attrs):
+        add = {child.id for child in attrs.get("add", [])}
+        remove = {child.id for child in attrs.get("remove", [])}
+        if not add and not remove:
+            raise serializers.ValidationError("Provide children to add or remove.")
+        if add & remove:
+            raise serializers.ValidationError("A child cannot be added and removed.")
+        return {"add": add, "remove": remove}
+
+
 # -----------------------------------------------------------
 # 👤 PARENT USER SERIALIZER
 # -----------------------------------------------------------
-class ParentUserSerializer(serializers.ModelSerializer):
+class ParentUserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "first_name", "email"]
@@ -47,7 +144,9 @@ class ParentUserSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------
 # 👤 PARENT USER WITH CREDENTIALS SERIALIZER (For child profile)
 # -----------------------------------------------------------
-class ParentUserWithCredentialsSerializer(serializers.ModelSerializer):
+class ParentUserWithCredentialsSerializer(
+    SparseFieldsetsMixin, serializers.ModelSerializer
+):
     """Shows parent credentials (username) for child's parent profile"""
 
     class Meta:
@@ -59,13 +158,15 @@ class ParentUserWithCredentialsSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------
 # 👶 CHILD LIST SERIALIZER (Lightweight for listings)
 # -----------------------------------------------------------
-class ChildListSerializer(serializers.ModelSerializer):
+class ChildListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     classroom_name = serializers.CharField(
         source="classroom.name", read_only=True, allow_null=True
     )
     parent_user_name = serializers.CharField(
         source="parent_user.username", read_only=True, allow_null=True
     )
+    # ✅ Small resized avatar for list screens (None until generated)
+    avatar_thumb = ImageVariantsField(source="avatar_variants", variant="thumb")
 
     class Meta:
         model = Child
@@ -77,15 +178,33 @@ class ChildListSerializer(serializers.ModelSerializer):
             "classroom_name",
             "parent_name",
             "avatar",
+            "avatar_thumb",
             "parent_user_name",
         ]
         read_only_fields = ["tenant"]
 
 
+class PaymentDueSerializer(ChildListSerializer):
+    """Child with its next payment date and reminder status"""
+
+    overdue = serializers.SerializerMethodField()
+    reminded = serializers.BooleanField(read_only=True)  # Annotated by the view
+
+    class Meta(ChildListSerializer.Meta):
+        fields = ChildListSerializer.Meta.fields + [
+            "next_payment_date",
+            "overdue",
+            "reminded",
+        ]
+
+    def get_overdue(self, obj):
+        return obj.next_payment_date < timezone.localdate()
+
+
 # -----------------------------------------------------------
 # 👶 CHILD DETAIL SERIALIZER (Full data)
 # -----------------------------------------------------------
-class ChildSerializer(serializers.ModelSerializer):
+class ChildSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     # ✅ Read-only related data
     classroom_name = serializers.CharField(
         source="classroom.name", read_only=True, allow_null=True
@@ -95,7 +214,7 @@ class ChildSerializer(serializers.ModelSerializer):
     )
 
     # ✅ Tenant-filtered many-to-many relationship for clubs
-    clubs = serializers.PrimaryKeyRelatedField(
+    clubs = TenantPrimaryKeyRelatedField(
         queryset=Club.objects.none(),
         many=True,
         required=False,
@@ -130,7 +249,7 @@ class ChildSerializer(serializers.ModelSerializer):
     has_mobile_app = serializers.BooleanField(required=False, default=False)
 
     # ✅ Write-friendly classroom
-    classroom_id = serializers.PrimaryKeyRelatedField(
+    classroom_id = TenantPrimaryKeyRelatedField(
         source="classroom",
         queryset=ClassRoom.objects.none(),
         write_only=True,
@@ -141,6 +260,9 @@ class ChildSerializer(serializers.ModelSerializer):
     # ✅ Make classroom read-only to avoid conflicts with classroom_id
     classroom = serializers.PrimaryKeyRelatedField(read_only=True)
 
+    # ✅ Resized avatars: {"thumb": {"webp": url, "jpeg": url}, "medium": {...}}
+    avatar_variants = ImageVariantsField()
+
     class Meta:
         model = Child
         fields = [
@@ -157,6 +279,7 @@ class ChildSerializer(serializers.ModelSerializer):
             "parent_credentials",  # ✅ All parent login credentials in one object
             "parent_name",
             "avatar",
+            "avatar_variants",
             "allergies",
             "conditions",
             "medication",
@@ -180,7 +303,8 @@ class ChildSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             tenant = request.user.tenant
-            self.fields["clubs"].queryset = Club.objects.filter(tenant=tenant)
+            if "clubs" in self.fields:  # May be left out by ?fields=
+                self.fields["clubs"].queryset = Club.objects.filter(tenant=tenant)
             self.fields["classroom_id"].queryset = ClassRoom.objects.filter(
                 tenant=tenant
             )
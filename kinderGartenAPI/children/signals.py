@@ -0,0 +1,69 @@
+"""
+Keep derived data in sync with single-child writes:
+- cached parent scopes (children.scope) when a child is linked to, moved
+  between or unlinked from parent accounts
+- ClassRoom.students_count (children.counters) when a child is created,
+  deleted or moved to another classroom
+- avatar variants (core.images) when the avatar changes
+- references to content-addressed avatars (core.media)
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.images import delete_variants, schedule_variants, storage_path
+from core.media import release_media, retain_media
+from .counters import adjust_students_counts
+from .models import Child
+from .scope import invalidate_parent_scope
+from .tasks import generate_avatar_variants
+
+
+@receiver(pre_save, sender=Child)
+def remember_previous_links(sender, instance, **kwargs):
+    """Stash the stored (parent_user_id, classroom_id) and stale avatar variants"""
+    instance._previous_links = None
+    instance._previous_avatar = None
+    instance._stale_variants = None
+    if instance.pk:
+        row = (
+            Child.objects.filter(pk=instance.pk)
+            .values_list("parent_user_id", "classroom_id", "avatar", "avatar_variants")
+            .first()
+        )
+        if row:
+            instance._previous_links = row[:2]
+            if row[2] != instance.avatar:
+                instance._previous_avatar = row[2]
+                instance._stale_variants = row[3]
+                instance.avatar_variants = {}
+
+
+@receiver(post_save, sender=Child)
+def sync_saved_child(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous_parent, previous_classroom = (
+        getattr(instance, "_previous_links", None) or (None, None)
+    )
+    if previous_parent != instance.parent_user_id:
+        invalidate_parent_scope(previous_parent, instance.parent_user_id)
+    if previous_classroom != instance.classroom_id:
+        adjust_students_counts({previous_classroom: -1, instance.classroom_id: 1})
+
+    stale_variants = getattr(instance, "_stale_variants", None)
+    if created or stale_variants is not None:
+        retain_media(storage_path(instance.avatar))
+        release_media(storage_path(getattr(instance, "_previous_avatar", None)))
+    if stale_variants:
+        transaction.on_commit(lambda: delete_variants(stale_variants))
+    if instance.avatar and (created or stale_variants is not None):
+        schedule_variants(generate_avatar_variants, instance.pk)
+
+
+@receiver(post_delete, sender=Child)
+def sync_deleted_child(sender, instance, **kwargs):
+    invalidate_parent_scope(instance.parent_user_id)
+    adjust_students_counts({instance.classroom_id: -1})
+    release_media(storage_path(instance.avatar))
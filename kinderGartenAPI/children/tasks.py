@@ -0,0 +1,70 @@
+from datetime import date
+
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+from core.images import delete_variants, generate_variants, storage_path
+from core.models import Tenant
+from .models import Child
+from .payments import remind_tenant
+
+logger = logging.getLogger("api")
+
+
+@shared_task
+def generate_avatar_variants(child_id):
+    """Resize a child's avatar into thumb/medium WebP and JPEG copies"""
+    child = Child.objects.filter(pk=child_id).only("avatar").first()
+    path = storage_path(child.avatar) if child else None
+    if not path:
+        return None  # Deleted child, no avatar or an external URL
+
+    try:
+        variants = generate_variants(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"No avatar variants for child {child_id}: {e}")
+        return None
+
+    # ✅ Skip if the avatar was replaced while this task ran
+    updated = Child.objects.filter(pk=child_id, avatar=child.avatar).update(
+        avatar_variants=variants, updated_at=timezone.now()
+    )
+    if not updated:
+        delete_variants(variants)
+        return None
+    logger.info(f"🖼️ Generated avatar variants for child {child_id}")
+    return variants
+
+
+@shared_task
+def remind_payments_due(days=3):
+    """Queue the payment reminders of every active tenant"""
+    today = timezone.localdate()
+    tenant_ids = list(
+        Tenant.objects.filter(is_active=True).values_list("id", flat=True)
+    )
+    for tenant_id in tenant_ids:
+        remind_tenant_payments_due.delay(tenant_id, today.isoformat(), days)
+
+    logger.info(f"💳 Queued payment reminders for {len(tenant_ids)} tenants")
+    return len(tenant_ids)
+
+
+@shared_task
+def remind_tenant_payments_due(tenant_id, today, days=3):
+    """
+    Send one chat reminder per child of a tenant whose payment is due within
+    `days` of `today` (ISO date)
+    """
+    try:
+        count = remind_tenant(tenant_id, date.fromisoformat(today), days)
+        if count:
+            logger.info(f"💳 Sent {count} payment reminders for tenant {tenant_id}")
+        return count
+    except Exception as e:
+        logger.error(
+            f"❌ Error sending payment reminders for tenant {tenant_id}: {e}",
+            exc_info=True,
+        )
+        raise
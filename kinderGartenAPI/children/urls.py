@@ -3,12 +3,23 @@ from rest_framework.routers import DefaultRouter
 from .views_upload import UploadAvatarView
 from .views import (
     ChildDetailView,
+    ChildEnrollmentImportView,
     ChildListCreateView,
+    ChildSearchView,
     ClassRoomListCreateView,
     ClassRoomDetailView,
+    ClassRoomDashboardView,
+    ClassRoomGrowthView,
+    ClassRoomPromotionView,
     ClubListCreateView,
     ClubDetailView,
+    ClubMembersView,
+    ClubSessionDetailView,
+    ClubSessionListCreateView,
+    ChildWhereaboutsView,
+    GrowthMeasurementListCreateView,
     MyChildView,
+    PaymentsDueView,
 )
 
 # Create a router for ViewSet actions
@@ -17,7 +28,25 @@ router = DefaultRouter()
 urlpatterns = [
     path("classes/", ClassRoomListCreateView.as_view(), name="classroom-list-create"),
     path("classes/<int:pk>/", ClassRoomDetailView.as_view(), name="classroom-detail"),
+    path(
+        "classes/dashboard/",
+        ClassRoomDashboardView.as_view(),
+        name="classroom-dashboard",
+    ),
+    path(
+        "classes/<int:pk>/growth/",
+        ClassRoomGrowthView.as_view(),
+        name="classroom-growth",
+    ),
+    path(
+        "classes/promote/",
+        ClassRoomPromotionView.as_view(),
+        name="classroom-promote",
+    ),
     path("", ChildListCreateView.as_view(), name="child-list-create"),
+    path("import/", ChildEnrollmentImportView.as_view(), name="child-import"),
+    path("search/", ChildSearchView.as_view(), name="child-search"),
+    path("payments-due/", PaymentsDueView.as_view(), name="child-payments-due"),
     path("upload-avatar/", UploadAvatarView.as_view(), name="upload-avatar"),
     path(
         "<int:pk>/",
@@ -43,5 +72,22 @@ urlpatterns = [
     ),
     path("clubs/", ClubListCreateView.as_view(), name="club-list-create"),
     path("clubs/<int:pk>/", ClubDetailView.as_view(), name="club-detail"),
+    path("clubs/<int:pk>/members/", ClubMembersView.as_view(), name="club-members"),
+    path(
+        "clubs/sessions/",
+        ClubSessionListCreateView.as_view(),
+        name="club-session-list-create",
+    ),
+    path(
+        "clubs/sessions/<int:pk>/",
+        ClubSessionDetailView.as_view(),
+        name="club-session-detail",
+    ),
+    path("whereabouts/", ChildWhereaboutsView.as_view(), name="child-whereabouts"),
+    path(
+        "measurements/",
+        GrowthMeasurementListCreateView.as_view(),
+        name="growth-measurement-list-create",
+    ),
     path("me/", MyChildView.as_view(), name="my-child"),
 ]
@@ -1,11 +1,17 @@
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.mixins import (
     RetrieveModelMixin,
     UpdateModelMixin,
     DestroyModelMixin,
 )
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.utils.text import slugify
 from django.utils.crypto import get_random_string
 from django.contrib.auth import get_user_model
@@ -14,15 +20,55 @@ from django.core.exceptions import ValidationError
 from rest_framework.exceptions import PermissionDenied
 import logging
 
-from children.models import Child, Club
+from children.models import (
+    Child,
+    Club,
+    ClubSession,
+    GrowthMeasurement,
+    PaymentReminder,
+    Weekday,
+)
 from .models import ClassRoom
 from children.serializers import (
     ChildSerializer,
     ChildListSerializer,
+    ClassRoomPromotionSerializer,
     ClassRoomSerializer,
+    GrowthMeasurementSerializer,
+    PaymentDueSerializer,
+)
+from .serializers import (
+    ClubMembersSerializer,
+    ClubSerializer,
+    ClubSessionSerializer,
+)
+from children.enrollment import (
+    EnrollmentError,
+    detect_format,
+    enroll_children,
+    read_rows,
+)
+from children.dashboard import get_dashboard
+from children.growth import classroom_growth, record_measurements
+from children.memberships import update_club_members
+from children.payments import MAX_PAYMENT_DUE_DAYS, due_children
+from children.promotion import PromotionError, promote_classrooms
+from children.search import search_children
+from children.whereabouts import locate_children
+from children.scope import (
+    filter_for_parent,
+    get_parent_child_ids,
+    invalidate_parent_scope,
+)
+from core.fieldsets import SparseFieldsetsViewMixin
+from core.mixins import ConditionalGetMixin
+from core.pagination import KeysetPagination
+from core.permissions import (
+    IsParentOfChild,
+    IsTenantAdmin,
+    IsTenantParent,
+    IsTenantMember,
 )
-from .serializers import ClubSerializer
-from core.permissions import IsTenantAdmin, IsTenantParent, IsTenantMember
 
 User = get_user_model()
 logger = logging.getLogger("api")
@@ -31,7 +77,9 @@ logger = logging.getLogger("api")
 # -----------------------------------------------------------
 # 📚 CLASSROOM LIST / CREATE
 # -----------------------------------------------------------
-class ClassRoomListCreateView(generics.ListCreateAPIView):
+class ClassRoomListCreateView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.ListCreateAPIView
+):
     serializer_class = ClassRoomSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -47,7 +95,9 @@ class ClassRoomListCreateView(generics.ListCreateAPIView):
 # -----------------------------------------------------------
 # 📚 CLASSROOM DETAIL / UPDATE / DELETE
 # -----------------------------------------------------------
-class ClassRoomDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ClassRoomDetailView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = ClassRoomSerializer
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
 
@@ -58,7 +108,9 @@ class ClassRoomDetailView(generics.RetrieveUpdateDestroyAPIView):
 # -----------------------------------------------------------
 # 🎨 CLUBS
 # -----------------------------------------------------------
-class ClubListCreateView(generics.ListCreateAPIView):
+class ClubListCreateView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.ListCreateAPIView
+):
     serializer_class = ClubSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -69,7 +121,9 @@ class ClubListCreateView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class ClubDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ClubDetailView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = ClubSerializer
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
 
@@ -77,11 +131,184 @@ class ClubDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Club.objects.filter(tenant=self.request.user.tenant).order_by("name")
 
 
+class MemberReadAdminWriteMixin:
+    """Tenant members read, admins write"""
+
+    def get_permissions(self):
+        if self.request.method in permissions.SAFE_METHODS:
+            return [permissions.IsAuthenticated(), IsTenantMember()]
+        return [permissions.IsAuthenticated(), IsTenantAdmin()]
+
+
+class ClubSessionListCreateView(
+    MemberReadAdminWriteMixin,
+    ConditionalGetMixin,
+    SparseFieldsetsViewMixin,
+    generics.ListCreateAPIView,
+):
+    """Weekly club sessions, ?club=<id> and ?weekday=<0-6> filters"""
+
+    serializer_class = ClubSessionSerializer
+    conditional_timestamp_fields = ("updated_at", "club__updated_at")
+
+    def list(self, request, *args, **kwargs):
+        self.session_filters = {}
+        for param, field in (("club", "club_id"), ("weekday", "weekday")):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                value = int(value)
+            except ValueError:
+                value = None
+            if value is None or (field == "weekday" and value not in Weekday.values):
+                return Response(
+                    {"error": "club must be an id and weekday between 0 and 6"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            self.session_filters[field] = value
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        qs = ClubSession.objects.filter(
+            tenant=self.request.user.tenant
+        ).select_related("club")
+        qs = qs.filter(**getattr(self, "session_filters", {}))
+        return qs.order_by("weekday", "start_time", "id")
+
+    def perform_create(self, serializer):
+        serializer.save(tenant=self.request.user.tenant)
+
+
+class ClubSessionDetailView(
+    MemberReadAdminWriteMixin,
+    ConditionalGetMixin,
+    SparseFieldsetsViewMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
+    serializer_class = ClubSessionSerializer
+    conditional_timestamp_fields = ("updated_at", "club__updated_at")
+
+    def get_queryset(self):
+        return ClubSession.objects.filter(
+            tenant=self.request.user.tenant
+        ).select_related("club")
+
+
+# -----------------------------------------------------------
+# 📏 GROWTH MEASUREMENTS
+# -----------------------------------------------------------
+class GrowthMeasurementListCreateView(
+    MemberReadAdminWriteMixin, SparseFieldsetsViewMixin, generics.ListCreateAPIView
+):
+    """Measurement history (?child=<id>); POST one measurement or a list"""
+
+    serializer_class = GrowthMeasurementSerializer
+
+    def list(self, request, *args, **kwargs):
+        self.child_id = request.query_params.get("child") or None
+        if self.child_id is not None:
+            try:
+                self.child_id = int(self.child_id)
+            except ValueError:
+                return Response(
+                    {"error": "child must be a child id"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        user = self.request.user
+        qs = GrowthMeasurement.objects.filter(tenant=user.tenant)
+        qs = filter_for_parent(qs, user, field="child_id")  # ✅ Cached parent scope
+        if getattr(self, "child_id", None) is not None:
+            qs = qs.filter(child_id=self.child_id)
+        return qs.order_by("-measured_on", "-id")
+
+    def create(self, request, *args, **kwargs):
+        """✅ OPTIMIZED: one upsert per set of submitted values, not per row"""
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+        entries = serializer.validated_data if many else [serializer.validated_data]
+        recorded = record_measurements(request.user.tenant, entries)
+        return Response({"recorded": recorded}, status=status.HTTP_201_CREATED)
+
+
+class ClassRoomGrowthView(generics.GenericAPIView):
+    """Latest measurement and WHO percentiles of every child of a classroom"""
+
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = GrowthMeasurementSerializer  # For schema generation
+    pagination_class = None
+
+    def get_queryset(self):
+        return ClassRoom.objects.filter(tenant=self.request.user.tenant)
+
+    def get(self, request, *args, **kwargs):
+        """✅ OPTIMIZED: one NumPy pass per curve, cached per measurement batch"""
+        classroom = self.get_object()
+        return Response(
+            {"classroom": classroom.id, "children": classroom_growth(classroom.id)}
+        )
+
+
+class ChildWhereaboutsView(generics.GenericAPIView):
+    """Where every child is at ?at=<ISO datetime> (default now)"""
+
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = ClubSessionSerializer  # For schema generation
+    pagination_class = None
+
+    def get(self, request):
+        """✅ OPTIMIZED: one query, running sessions found on their index"""
+        raw_at = request.query_params.get("at")
+        try:
+            at = parse_datetime(raw_at) if raw_at else timezone.now()
+        except ValueError:
+            at = None
+        if at is None:
+            return Response(
+                {"error": "at must be an ISO 8601 datetime"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if timezone.is_aware(at):
+            at = timezone.localtime(at)  # Sessions are in local time
+        located = locate_children(request.user.tenant_id, at)
+        return Response({"at": at.isoformat(), "weekday": at.weekday(), **located})
+
+
+class ClubMembersView(generics.GenericAPIView):
+    """Add and remove many club members at once: {"add": [ids], "remove": [ids]}"""
+
+    serializer_class = ClubMembersSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+
+    def get_queryset(self):
+        return Club.objects.filter(tenant=self.request.user.tenant)
+
+    def post(self, request, *args, **kwargs):
+        """✅ OPTIMIZED: bulk writes on the through table, returns the diff"""
+        club = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        diff = update_club_members(club, **serializer.validated_data)
+        logger.info(
+            f"Club {club.id} members updated by {request.user.username}: "
+            f"{len(diff['added'])} added, {len(diff['removed'])} removed"
+        )
+        return Response({"club": club.id, **diff})
+
+
 # -----------------------------------------------------------
 # 👶 CHILD LIST / CREATE - OPTIMIZED
 # -----------------------------------------------------------
-class ChildListCreateView(generics.ListCreateAPIView):
+class ChildListCreateView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.ListCreateAPIView
+):
     permission_classes = [permissions.IsAuthenticated]
+    conditional_timestamp_fields = ("updated_at", "classroom__updated_at")
+    pagination_class = KeysetPagination  # ✅ (name, id) cursors, no OFFSET
 
     def get_serializer_class(self):
         """Use lightweight serializer for list, full for create"""
@@ -99,8 +326,7 @@ class ChildListCreateView(generics.ListCreateAPIView):
             .order_by("name")  # ✅ Ordering for consistent pagination
         )
 
-        if user.role == "parent":
-            qs = qs.filter(parent_user=user)
+        qs = filter_for_parent(qs, user)  # ✅ Cached parent scope
 
         classroom_id = self.request.query_params.get(
             "classroom_id"
@@ -177,10 +403,19 @@ class ChildListCreateView(generics.ListCreateAPIView):
 # 👶 CHILD DETAIL - OPTIMIZED WITH MOBILE APP ACTIONS
 # -----------------------------------------------------------
 class ChildDetailView(
+    ConditionalGetMixin,
+    SparseFieldsetsViewMixin,
     RetrieveModelMixin, UpdateModelMixin, DestroyModelMixin, viewsets.GenericViewSet
 ):
     serializer_class = ChildSerializer
-    permission_classes = [permissions.IsAuthenticated, IsTenantMember]
+    conditional_timestamp_fields = (
+        "updated_at", "classroom__updated_at", "clubs__updated_at"
+    )
+    permission_classes = [
+        permissions.IsAuthenticated,
+        IsTenantMember,
+        IsParentOfChild,
+    ]
 
     def get_queryset(self):
         """✅ OPTIMIZED queryset"""
@@ -192,9 +427,7 @@ class ChildDetailView(
             .order_by("name")  # ✅ Ordering for consistent pagination
         )
 
-        if user.role == "parent":
-            return qs.filter(parent_user=user)
-        return qs
+        return filter_for_parent(qs, user)  # ✅ Cached parent scope
 
     @action(
         detail=True,
@@ -250,6 +483,7 @@ class ChildDetailView(
 
                 child.has_mobile_app = True
                 child.save()
+                invalidate_parent_scope(child.parent_user_id)
 
                 logger.info(f"Enabled mobile app for child {child.id}")
 
@@ -302,6 +536,7 @@ class ChildDetailView(
                 child.parent_password = ""
                 child.parent_user = None
                 child.save()
+                invalidate_parent_scope(parent_user and parent_user.id)
 
                 # Delete parent user account
                 if parent_user:
@@ -329,20 +564,178 @@ class ChildDetailView(
             )
 
 
+# -----------------------------------------------------------
+# 📥 BULK ENROLLMENT IMPORT
+# -----------------------------------------------------------
+class ChildEnrollmentImportView(generics.GenericAPIView):
+    """Enroll many children (and parent accounts) from a CSV or XLSX upload"""
+
+    parser_classes = [MultiPartParser, FormParser]
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = ChildListSerializer  # For schema generation
+
+    def post(self, request):
+        file_obj = request.FILES.get("file")
+        if not file_obj:
+            return Response(
+                {"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fmt = request.data.get("format") or detect_format(file_obj.name)
+        try:
+            rows = read_rows(file_obj, fmt)
+        except EnrollmentError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = enroll_children(rows, request.user.tenant)
+        except EnrollmentError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        logger.info(
+            f"Enrollment import by {request.user.username}: "
+            f"{result['created']} created, {result['rejected']} rejected"
+        )
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+# -----------------------------------------------------------
+# 📊 CLASSROOM DASHBOARD
+# -----------------------------------------------------------
+class ClassRoomDashboardView(generics.GenericAPIView):
+    """Per-classroom counts for the admin home screen, for ?date= or today"""
+
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+    serializer_class = ClassRoomSerializer  # For schema generation
+    pagination_class = None
+
+    def get(self, request):
+        """✅ OPTIMIZED: one aggregated query, cached per tenant and day"""
+        raw_date = request.query_params.get("date")
+        try:
+            day = parse_date(raw_date) if raw_date else None
+        except ValueError:
+            day = None
+        if raw_date and day is None:
+            return Response(
+                {"error": "date must be YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(get_dashboard(request.user.tenant_id, day))
+
+
+# -----------------------------------------------------------
+# 🎓 CLASSROOM PROMOTION
+# -----------------------------------------------------------
+class ClassRoomPromotionView(generics.GenericAPIView):
+    """Move every child of the mapped classrooms at once (end of school year)"""
+
+    serializer_class = ClassRoomPromotionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+
+    def post(self, request):
+        """✅ OPTIMIZED: one UPDATE per mapping, counters adjusted in bulk"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data["dry_run"]
+        try:
+            moves = promote_classrooms(
+                request.user.tenant_id,
+                serializer.validated_data["mapping"],
+                dry_run=dry_run,
+            )
+        except PromotionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        moved = sum(len(move["children"]) for move in moves)
+        if not dry_run:
+            logger.info(
+                f"Classroom promotion by {request.user.username}: {moved} moved"
+            )
+        return Response({"dry_run": dry_run, "moved": moved, "moves": moves})
+
+
+# -----------------------------------------------------------
+# 💳 PAYMENTS DUE
+# -----------------------------------------------------------
+class PaymentsDueView(SparseFieldsetsViewMixin, generics.ListAPIView):
+    """Children whose next payment is due within ?days= (default 7) or overdue"""
+
+    serializer_class = PaymentDueSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantAdmin]
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.days = int(request.query_params.get("days", 7))
+        except ValueError:
+            self.days = -1
+        if not 0 <= self.days <= MAX_PAYMENT_DUE_DAYS:
+            return Response(
+                {"error": f"days must be between 0 and {MAX_PAYMENT_DUE_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """✅ OPTIMIZED: one range scan on the (tenant, next_payment_date) index"""
+        today = timezone.localdate()
+        reminders = PaymentReminder.objects.filter(
+            child_id=OuterRef("pk"),
+            due_date=OuterRef("next_payment_date"),
+            notified=True,
+        )
+        return (
+            due_children(self.request.user.tenant_id, today + timedelta(days=self.days))
+            .select_related("classroom", "parent_user")
+            .annotate(reminded=Exists(reminders))
+        )
+
+
+# -----------------------------------------------------------
+# 🔎 CHILD SEARCH
+# -----------------------------------------------------------
+class ChildSearchView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.ListAPIView
+):
+    """Ranked name search: ?q=<terms> over child, parent and contact names"""
+
+    serializer_class = ChildListSerializer
+    conditional_timestamp_fields = ("updated_at", "classroom__updated_at")
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = []  # ✅ Ranking decides the order
+
+    def get_queryset(self):
+        user = self.request.user
+        qs = filter_for_parent(Child.objects.filter(tenant=user.tenant), user)
+        return (
+            search_children(qs, self.request.query_params.get("q", ""))
+            .select_related("classroom", "parent_user")  # ✅ FK optimization
+            .order_by("-rank", "name", "id")
+        )
+
+
 # -----------------------------------------------------------
 # MY CHILD VIEW
 # -----------------------------------------------------------
-class MyChildView(generics.RetrieveAPIView):
+class MyChildView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.RetrieveAPIView
+):
     serializer_class = ChildSerializer
+    conditional_timestamp_fields = (
+        "updated_at", "classroom__updated_at", "clubs__updated_at"
+    )
     permission_classes = [permissions.IsAuthenticated, IsTenantParent]
 
     def get_object(self):
-        """✅ OPTIMIZED: Get parent's own child"""
+        """✅ OPTIMIZED: Get parent's own child from the cached scope"""
+        child_ids = get_parent_child_ids(self.request.user)
         try:
-            return (
-                Child.objects.select_related("classroom", "parent_user")
-                .prefetch_related("clubs")
-                .get(parent_user=self.request.user)
+            if not child_ids:
+                raise Child.DoesNotExist
+            queryset = Child.objects.select_related(
+                "classroom", "parent_user"
+            ).prefetch_related("clubs")
+            return self.filter_queryset(queryset).get(
+                pk=child_ids[0], parent_user=self.request.user
             )
         except Child.DoesNotExist:
             logger.warning(f"Parent {self.request.user.id} has no child assigned")
@@ -1,13 +1,12 @@
 import logging
-import uuid
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.core.exceptions import ValidationError
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, serializers
 
+from core.media import store_upload
 from core.validators import validate_file_upload, MAX_AVATAR_SIZE
 
 logger = logging.getLogger("api")
@@ -50,14 +49,10 @@ class UploadAvatarView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # ✅ Generate safe filename (prevent directory traversal)
-            ext = file_obj.name.split(".")[-1].lower()
-            safe_name = f"{uuid.uuid4()}.{ext}"
-
-            # ✅ Save to tenant-specific directory
-            file_path = f"avatars/{request.user.tenant.slug}/{safe_name}"
-            saved_path = default_storage.save(file_path, file_obj)
-            file_url = request.build_absolute_uri(f"/media/{saved_path}")
+            # ✅ Content-addressed: the same image is stored once per tenant,
+            # the child it is assigned to takes the reference (children.signals)
+            blob = store_upload(file_obj, request.user.tenant, reference=False)
+            file_url = request.build_absolute_uri(default_storage.url(blob.file.name))
 
             logger.info(f"Avatar uploaded by user {request.user.id}")
 
@@ -0,0 +1,80 @@
+"""
+Where every child of a tenant is at a given time.
+
+A child is in the club session of one of their clubs running at that time
+(weekday and start_time <= T < end_time, on the ClubSession index), else in
+their classroom. One query: the tenant's children, each annotated with its
+running session as a JSON object by a correlated subquery.
+"""
+
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import JSONObject
+
+from .models import Child, ClubSession
+
+
+def running_sessions(tenant_id, at):
+    """Club sessions of a tenant running at datetime `at`"""
+    moment = at.time()
+    return ClubSession.objects.filter(
+        tenant_id=tenant_id,
+        weekday=at.weekday(),
+        start_time__lte=moment,
+        end_time__gt=moment,
+    )
+
+
+def locate_children(tenant_id, at):
+    """
+    Returns:
+        {"sessions": [...], "classrooms": [...], "unassigned": [children]},
+        each location with the children in it
+    """
+    session = (
+        running_sessions(tenant_id, at)
+        .filter(club__children=OuterRef("pk"))
+        .order_by("start_time", "id")  # Overlapping clubs: the earliest one
+        .values(
+            json=JSONObject(
+                id="id",
+                club_id="club_id",
+                club=F("club__name"),
+                room="room",
+                start_time="start_time",
+                end_time="end_time",
+            )
+        )[:1]
+    )
+    children = (
+        Child.objects.filter(tenant_id=tenant_id)
+        .annotate(session=Subquery(session))
+        .order_by("name", "id")
+        .values("id", "name", "classroom_id", "classroom__name", "session")
+    )
+
+    sessions, classrooms, unassigned = {}, {}, []
+    for child in children:
+        entry = {"id": child["id"], "name": child["name"]}
+        if child["session"]:
+            location = sessions.setdefault(
+                child["session"]["id"], {**child["session"], "children": []}
+            )
+        elif child["classroom_id"]:
+            location = classrooms.setdefault(
+                child["classroom_id"],
+                {
+                    "id": child["classroom_id"],
+                    "name": child["classroom__name"],
+                    "children": [],
+                },
+            )
+        else:
+            unassigned.append(entry)
+            continue
+        location["children"].append(entry)
+
+    return {
+        "sessions": sorted(sessions.values(), key=lambda s: (s["start_time"], s["id"])),
+        "classrooms": sorted(classrooms.values(), key=lambda c: (c["name"], c["id"])),
+        "unassigned": unassigned,
+    }
@@ -0,0 +1,129 @@
+"""
+Shared serializer fields.
+
+Tenant-aware primary key relations resolved in bulk:
+
+PrimaryKeyRelatedField(many=True) runs one queryset.get() per submitted id.
+TenantPrimaryKeyRelatedField resolves the whole list with a single
+in_bulk() query, and restricts lookups to the requesting user's tenant.
+
+    clubs = TenantPrimaryKeyRelatedField(queryset=Club.objects.all(), many=True)
+
+Assigning `.queryset` on the many field (self.fields["clubs"].queryset = ...)
+reaches the lookups, unlike DRF's ManyRelatedField.
+
+ImageVariantsField renders the variant paths recorded by core.images as URLs.
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from .images import media_url
+
+
+class BatchedManyRelatedField(ManyRelatedField):
+    """ManyRelatedField validating every submitted pk with one query"""
+
+    @property
+    def queryset(self):
+        return self.child_relation.queryset
+
+    @queryset.setter
+    def queryset(self, queryset):
+        self.child_relation.queryset = queryset
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.to_internal_values(data)
+
+
+class TenantPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField scoped to request.user.tenant, batched with many=True"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+        if user and user.is_authenticated and hasattr(queryset.model, "tenant_id"):
+            queryset = queryset.filter(tenant_id=user.tenant_id)
+        return queryset
+
+    def to_internal_value(self, data):
+        return self.to_internal_values([data])[0]
+
+    def _to_pk(self, value, model_pk):
+        if self.pk_field is not None:
+            value = self.pk_field.to_internal_value(value)
+        if isinstance(value, bool):
+            self.fail("incorrect_type", data_type=type(value).__name__)
+        try:
+            return model_pk.to_python(value)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(value).__name__)
+
+    def prefetch(self, data):
+        """
+        Resolve pks ahead with one query, for a field validated once per row
+        of a list (many=True serializers). Invalid values are left for the
+        row validation to report.
+        """
+        queryset = self.get_queryset()
+        pks = set()
+        for value in data:
+            try:
+                pks.add(self._to_pk(value, queryset.model._meta.pk))
+            except serializers.ValidationError:
+                continue
+        self._prefetched = queryset.in_bulk(pks) if pks else {}
+
+    def to_internal_values(self, data):
+        """Resolve a list of pks with one IN query, keeping the submitted order"""
+        queryset = self.get_queryset()
+        pks = [self._to_pk(value, queryset.model._meta.pk) for value in data]
+
+        objects = dict(getattr(self, "_prefetched", {}))
+        missing = set(pks) - set(objects)
+        if missing:
+            objects.update(queryset.in_bulk(missing))
+        for pk in pks:
+            if pk not in objects:
+                self.fail("does_not_exist", pk_value=pk)
+        return [objects[pk] for pk in pks]
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only URLs of image variants ({"webp": url, "jpeg": url}).
+    With variant=None, every variant is returned keyed by name. Renders None
+    until the variants have been generated.
+    """
+
+    def __init__(self, variant=None, **kwargs):
+        self.variant = variant
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def _url(self, path):
+        return media_url(path, self.context.get("request"))
+
+    def to_representation(self, value):
+        variants = {
+            name: {fmt: self._url(path) for fmt, path in encoded.items()}
+            for name, encoded in (value or {}).items()
+            if self.variant in (None, name)
+        }
+        if self.variant is not None:
+            return variants.get(self.variant)
+        return variants or None
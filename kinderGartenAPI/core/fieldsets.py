@@ -0,0 +1,145 @@
+"""
+Sparse fieldsets: ?fields=id,name,avatar or ?exclude=allergies,club_details.
+
+SparseFieldsetsMixin (serializers) drops the unrequested fields of the
+top-level serializer on safe (GET/HEAD/OPTIONS) requests. Write-only fields
+are never dropped, they are not rendered anyway.
+
+SparseFieldsetsViewMixin (views) then pushes the remaining fields into the
+queryset: .only() on the columns they read, and select_related /
+prefetch_related trimmed to the relations still rendered. Fields reading
+arbitrary attributes (SerializerMethodField, properties) keep the full
+queryset, since what they touch cannot be known.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+def requested_fieldsets(request):
+    """Return (fields to keep or None, fields to drop) for a request"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+
+    params = getattr(request, "query_params", request.GET)  # DRF or Django
+
+    def parse(param):
+        value = params.get(param)
+        if value is None:
+            return None
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    return parse(FIELDS_PARAM), parse(EXCLUDE_PARAM) or set()
+
+
+class SparseFieldsetsMixin:
+    """Serializer mixin honouring ?fields= and ?exclude= on safe requests"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.root
+        top_level = root is self or (
+            isinstance(root, ListSerializer) and root.child is self
+        )
+        if not top_level:
+            return fields
+
+        keep, drop = requested_fieldsets(self.context.get("request"))
+        for name in list(fields):
+            if fields[name].write_only:
+                continue
+            if (keep is not None and name not in keep) or name in drop:
+                del fields[name]
+        return fields
+
+
+def _field_paths(model, field):
+    """
+    Return (only paths, select_related roots, prefetch roots) needed to
+    render a serializer field, or None if they cannot be determined.
+    """
+    source = field.source
+    if source == "*":
+        return None
+
+    name, *rest = source.split(".")
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None  # Property or method
+
+    if model_field.many_to_many or model_field.one_to_many:
+        return set(), set(), {name}
+    if not model_field.is_relation:
+        return {name}, set(), set()
+    if model_field.one_to_one and model_field.auto_created:
+        return None  # Reverse one-to-one
+
+    # Forward FK / one-to-one
+    if not rest and not isinstance(field, BaseSerializer):
+        return {name}, set(), set()  # Primary key only
+    if rest:
+        try:
+            model_field.related_model._meta.get_field(rest[0])
+            return {name, f"{name}__{rest[0]}"}, {name}, set()
+        except FieldDoesNotExist:
+            pass
+    return {name}, {name}, set()
+
+
+def prune_queryset(queryset, fields):
+    """Restrict a queryset to what `fields` (serializer fields) render"""
+    model = queryset.model
+    only = {model._meta.pk.name}
+    selected, prefetched = set(), set()
+
+    for field in fields:
+        if field.write_only:
+            continue
+        paths = _field_paths(model, field)
+        if paths is None:
+            return queryset
+        only |= paths[0]
+        selected |= paths[1]
+        prefetched |= paths[2]
+
+    # Columns used outside serialization: tenant checks and keyset cursors
+    ordering = queryset.query.order_by or model._meta.ordering
+    for name in ["tenant", *(f.lstrip("-") for f in ordering if isinstance(f, str))]:
+        try:
+            if model._meta.get_field(name).concrete:
+                only.add(name)
+        except FieldDoesNotExist:
+            pass
+
+    joined = set()
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        joined = {name for name in select_related if name in selected}
+        queryset = queryset.select_related(None)
+        if joined:  # select_related() without names would follow every FK
+            queryset = queryset.select_related(*joined)
+    # Related columns can only be restricted on joined relations
+    only = {path for path in only if path.split("__")[0] in joined or "__" not in path}
+
+    prefetches = [
+        lookup
+        for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, "prefetch_to", lookup).split("__")[0] in prefetched
+    ]
+    return queryset.prefetch_related(None).prefetch_related(*prefetches).only(*only)
+
+
+class SparseFieldsetsViewMixin:
+    """View mixin pruning the queryset to the fields requested with ?fields="""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        keep, drop = requested_fieldsets(self.request)
+        if keep is None and not drop:
+            return queryset
+        return prune_queryset(queryset, self.get_serializer().fields.values())
@@ -0,0 +1,139 @@
+"""
+Resized variants of uploaded images (avatars, report photos).
+
+Each image gets a `thumb` and a `medium` variant, in WebP and JPEG (for
+clients without WebP), stored next to the original:
+
+    avatars/<tenant>/<name>.png -> avatars/<tenant>/<name>_thumb.webp, ...
+
+Variants are re-encoded from the pixels only, so EXIF data (GPS position,
+camera, ...) is dropped; the EXIF orientation is applied first. They are
+generated by Celery tasks queued with schedule_variants() and recorded as
+{"thumb": {"webp": path, "jpeg": path}, "medium": {...}} on the model.
+"""
+
+import io
+import logging
+import os
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger("api")
+
+VARIANT_SIZES = {"thumb": 160, "medium": 800}  # Longest side, in pixels
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def storage_path(url):
+    """Storage name of a media URL or path, None if it is not local media"""
+    path = urlparse(url or "").path
+    if path.startswith(settings.MEDIA_URL):
+        return path[len(settings.MEDIA_URL) :]
+    if path and not urlparse(url).netloc and not path.startswith("/"):
+        return path
+    return None
+
+
+def media_url(value, request=None):
+    """
+    URL of a media reference (storage name, /media/ path or full URL, returned
+    as is), absolute when a request is given
+    """
+    if not value or urlparse(value).netloc:
+        return value
+    path = storage_path(value)
+    url = default_storage.url(path) if path is not None else value
+    return request.build_absolute_uri(url) if request else url
+
+
+def _flatten(image):
+    """RGB copy of an image, transparent areas on white (JPEG has no alpha)"""
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variants(fp):
+    """
+    Return {variant: {format: encoded bytes}} for an image file object.
+    Raises ValueError if the file is not a readable image.
+    """
+    try:
+        with Image.open(fp) as original:
+            image = _flatten(ImageOps.exif_transpose(original))
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Not a readable image: {e}")
+
+    rendered = {}
+    for variant, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)  # Never upscales
+        for name, (pil_format, _, options) in VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            rendered.setdefault(variant, {})[name] = buffer.getvalue()
+    return rendered
+
+
+def variant_paths(name):
+    """Where the variants of a stored image go: {variant: {format: path}}"""
+    stem = os.path.splitext(name)[0]
+    return {
+        variant: {
+            fmt: f"{stem}_{variant}.{extension}"
+            for fmt, (_, extension, _) in VARIANT_FORMATS.items()
+        }
+        for variant in VARIANT_SIZES
+    }
+
+
+def generate_variants(name, storage=default_storage):
+    """Render and store the variants of a stored image, return their paths"""
+    from .media import is_content_addressed
+
+    paths = variant_paths(name)
+    targets = [path for encoded in paths.values() for path in encoded.values()]
+    if is_content_addressed(name) and all(map(storage.exists, targets)):
+        return paths  # Same content, same variants
+
+    with storage.open(name, "rb") as fp:
+        rendered = render_variants(fp)
+    for variant, encoded in rendered.items():
+        for fmt, data in encoded.items():
+            if storage.exists(paths[variant][fmt]):
+                storage.delete(paths[variant][fmt])
+            paths[variant][fmt] = storage.save(paths[variant][fmt], ContentFile(data))
+    return paths
+
+
+def delete_variants(variants, storage=default_storage):
+    """Delete variants; shared ones (content-addressed) go with their blob"""
+    from .media import is_content_addressed
+
+    for encoded in (variants or {}).values():
+        for path in encoded.values():
+            if not is_content_addressed(path):
+                storage.delete(path)
+
+
+def schedule_variants(task, pk):
+    """Queue a variant task for `pk` once the current transaction commits"""
+
+    def enqueue():
+        try:
+            task.delay(pk)
+        except Exception as e:
+            logger.warning(f"Could not queue {task.name} for {pk}: {e}")
+
+    transaction.on_commit(enqueue)
@@ -0,0 +1,166 @@
+"""
+Content-addressed media storage.
+
+Uploads are hashed (SHA-256) while Django streams them in, by the upload
+handlers below, and stored once per tenant and content under
+
+    cas/<tenant slug>/<first 2 hex digits>/<sha256>.<ext>
+
+A MediaBlob row per file counts its references: report media take one when
+created, avatars when a child points at them (children.signals).
+release_media() drops a reference and deletes the file, with its image
+variants, along with the last one. Unreferenced uploads (an avatar uploaded
+but never assigned) are purged by core.tasks.purge_unreferenced_media.
+
+A path never changes content, so the files are served as immutable
+(core.views.serve_media_blob).
+"""
+
+import hashlib
+import os
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .images import variant_paths
+from .models import MediaBlob
+
+CAS_PREFIX = "cas/"
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class HashingUploadMixin:
+    """Upload handler mixin setting `.sha256` on the files it completes"""
+
+    def new_file(self, *args, **kwargs):
+        self._digest = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file_obj = super().file_complete(file_size)
+        if file_obj is not None:
+            file_obj.sha256 = self._digest.hexdigest()
+        return file_obj
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingUploadMixin, TemporaryFileUploadHandler
+):
+    pass
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CAS_PREFIX)
+
+
+def hash_file(file_obj):
+    """SHA-256 of a file, reusing the digest computed during upload"""
+    if getattr(file_obj, "sha256", None):
+        return file_obj.sha256
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def content_path(tenant, sha256, filename):
+    ext = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    suffix = f".{ext}" if ext.isalnum() else ""
+    return f"{CAS_PREFIX}{tenant.slug}/{sha256[:2]}/{sha256}{suffix}"
+
+
+def store_upload(file_obj, tenant, reference=True):
+    """
+    Store an uploaded file once per content and tenant.
+
+    Args:
+        reference: Count a reference now (False when the caller takes it
+            later, like avatars assigned by a separate request)
+
+    Returns:
+        The MediaBlob holding the content
+    """
+    sha256 = hash_file(file_obj)
+    blobs = MediaBlob.objects.filter(tenant=tenant, sha256=sha256)
+    if blobs.update(
+        refcount=F("refcount") + int(reference), updated_at=timezone.now()
+    ):
+        return blobs.get()
+
+    path = content_path(tenant, sha256, file_obj.name)
+    try:
+        with transaction.atomic():
+            blob = MediaBlob.objects.create(
+                tenant=tenant,
+                sha256=sha256,
+                file=path,
+                size=file_obj.size,
+                content_type=getattr(file_obj, "content_type", "") or "",
+                refcount=int(reference),
+            )
+    except IntegrityError:
+        # Same content stored concurrently, reference that copy
+        return store_upload(file_obj, tenant, reference)
+
+    # A rolled back upload may have left the file behind, same content anyway
+    if not default_storage.exists(path):
+        default_storage.save(path, file_obj)
+    return blob
+
+
+def retain_media(name):
+    """Add a reference to a stored file"""
+    if is_content_addressed(name):
+        MediaBlob.objects.filter(file=name).update(refcount=F("refcount") + 1)
+
+
+def release_media(name):
+    """
+    Drop a reference to a stored file, deleting it with the last one.
+    Returns False if `name` is not content-addressed (the caller owns it).
+    """
+    if not is_content_addressed(name):
+        return False
+    MediaBlob.objects.filter(file=name, refcount__gt=0).update(
+        refcount=F("refcount") - 1
+    )
+    deleted, _ = MediaBlob.objects.filter(file=name, refcount=0).delete()
+    if deleted:
+        transaction.on_commit(lambda: delete_blob_files([name]))
+    return True
+
+
+def delete_blob_files(names, storage=default_storage):
+    for name in names:
+        variants = variant_paths(name).values()
+        for path in [name, *(path for paths in variants for path in paths.values())]:
+            storage.delete(path)
+
+
+@transaction.atomic
+def purge_unreferenced(older_than=timedelta(hours=24)):
+    """Delete blobs nothing points at, left untouched for `older_than`"""
+    names = list(
+        MediaBlob.objects.select_for_update()
+        .filter(refcount=0, updated_at__lt=timezone.now() - older_than)
+        .values_list("file", flat=True)
+    )
+    MediaBlob.objects.filter(file__in=names).delete()
+    transaction.on_commit(lambda: delete_blob_files(names))
+    return len(names)
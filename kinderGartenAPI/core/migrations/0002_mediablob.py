@@ -0,0 +1,50 @@
+# Generated migration for content-addressed media storage
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("sha256", models.CharField(max_length=64)),
+                ("file", models.FileField(max_length=255, unique=True, upload_to="")),
+                ("size", models.PositiveBigIntegerField()),
+                (
+                    "content_type",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                ("refcount", models.PositiveIntegerField(default=0)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Media blob",
+                "verbose_name_plural": "Media blobs",
+                "unique_together": {("tenant", "sha256")},
+            },
+        ),
+    ]
@@ -1,4 +1,95 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
 class TenantSaveMixin:
     """Call serializer.save(tenant=request.user.tenant, ...) on create."""
     def perform_create(self, serializer):
         serializer.save(tenant=self.request.user.tenant)
+
+
+class ConditionalGetMixin:
+    """
+    ETag on list and retrieve (plus Last-Modified on retrieve), answering 304
+    before serializing.
+
+    Validators come from one aggregate over the filtered queryset: the latest
+    of `conditional_timestamp_fields` and the row count (so deletions change
+    the ETag too). Add related timestamps ("classroom__updated_at") when the
+    representation embeds related rows. The ETag also covers the user and
+    the full path, since both shape the response. Lists send no Last-Modified:
+    deleting a row does not move the latest timestamp, so If-Modified-Since
+    alone would keep answering 304.
+
+    Queryset .update() calls must set updated_at themselves to be noticed.
+    """
+
+    conditional_timestamp_fields = ("updated_at",)
+
+    def get_conditional_validators(self, queryset=None, instance=None):
+        """Return (etag, last modified datetime or None)"""
+        fields = self.conditional_timestamp_fields
+        if instance is not None and tuple(fields) == ("updated_at",):
+            count, timestamps = 1, [instance.updated_at]
+        else:
+            if instance is not None:
+                queryset = type(instance)._default_manager.filter(pk=instance.pk)
+            values = queryset.order_by().aggregate(
+                rows=Count("pk", distinct=True),
+                **{f"last_{i}": Max(field) for i, field in enumerate(fields)},
+            )
+            count = values.pop("rows")
+            timestamps = [value for value in values.values() if value is not None]
+
+        last_modified = max(timestamps) if timestamps else None
+        key = "|".join(
+            [
+                type(self).__name__,
+                str(self.request.user.pk),
+                self.request.get_full_path(),
+                last_modified.isoformat() if last_modified else "",
+                str(count),
+            ]
+        )
+        return f'W/"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+    def conditional_response(self, queryset=None, instance=None):
+        """Return a 304 response if the client copy is current, else None"""
+        etag, last_modified = self.get_conditional_validators(queryset, instance)
+        if instance is None:
+            last_modified = None
+        self._validators = etag, last_modified
+        return get_conditional_response(
+            self.request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "_validators", None)
+        if validators and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response.headers["ETag"] = etag
+            if last_modified:
+                response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        not_modified = self.conditional_response(queryset)
+        if not_modified is not None:
+            return not_modified
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        not_modified = self.conditional_response(instance=instance)
+        if not_modified is not None:
+            return not_modified
+        return Response(self.get_serializer(instance).data)
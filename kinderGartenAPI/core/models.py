@@ -47,3 +47,24 @@ class BaseTenantModel(models.Model):
         # For debug clarity — show tenant context in derived models
         tenant_name = getattr(self.tenant, "slug", "?")
         return f"{self.__class__.__name__} (tenant={tenant_name})"
+
+
+class MediaBlob(BaseTenantModel):
+    """
+    One stored file per distinct content (SHA-256) and tenant, see core.media.
+    refcount is the number of avatars / report media pointing at it.
+    """
+
+    sha256 = models.CharField(max_length=64)
+    file = models.FileField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    refcount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Media blob"
+        verbose_name_plural = "Media blobs"
+        unique_together = [["tenant", "sha256"]]  # One copy per content
+
+    def __str__(self):
+        return self.file.name
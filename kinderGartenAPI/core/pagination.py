@@ -0,0 +1,238 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are selected with a WHERE clause on the queryset's ordering plus id
+(name > 'Bob' OR (name = 'Bob' AND id > 42)) instead of a growing OFFSET, and
+no COUNT(*) runs unless the client asks for one:
+
+    ?count=exact     COUNT(*) of the filtered queryset
+    ?count=estimate  planner row estimate on PostgreSQL (exact elsewhere)
+
+Cursors are opaque base64 tokens holding the ordering and the values of the
+boundary row. A cursor built for another ordering (e.g. after changing
+?ordering=) or holding values the fields do not accept is rejected with a 404.
+Nullable ordering fields sort NULLs after every value (first when descending)
+on every database, and the WHERE clause matches them with IS NULL branches.
+
+Enable per view with pagination_class = KeysetPagination, or globally through
+REST_FRAMEWORK["DEFAULT_PAGINATION_CLASS"] = "core.pagination.KeysetPagination".
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from uuid import UUID
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_MODES = ("exact", "estimate")
+
+
+def get_keyset_ordering(queryset):
+    """Return the queryset's ordering with the primary key as final tiebreaker"""
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    if not all(isinstance(field, str) and field != "?" for field in ordering):
+        raise ImproperlyConfigured(
+            "Keyset pagination needs an ordering made of field names"
+        )
+
+    pk = queryset.model._meta.pk.name
+    ordering = [
+        field.replace("pk", pk) if field.lstrip("-") == "pk" else field
+        for field in ordering
+    ]
+    if not any(field.lstrip("-") == pk for field in ordering):
+        ordering.append(pk)
+    return ordering
+
+
+def estimate_count(queryset):
+    """Row estimate from the PostgreSQL planner, without running the query"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _reverse(ordering):
+    return [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+
+
+def _nullable(model, field):
+    """Whether an ordering path can be NULL (nullable column or relation)"""
+    for part in field.lstrip("-").split("__"):
+        model_field = model._meta.get_field(part)
+        if model_field.null or not model_field.concrete:
+            return True
+        model = model_field.related_model or model
+    return False
+
+
+def _order_by(ordering):
+    """ORDER BY expressions sorting NULLs as the largest value"""
+    return [
+        F(field[1:]).desc(nulls_first=True)
+        if field.startswith("-")
+        else F(field).asc(nulls_last=True)
+        for field in ordering
+    ]
+
+
+def _after(ordering, position, nullable):
+    """Q matching the rows that come after `position` in `ordering`"""
+    clauses, equal = [], Q()
+    for field, value, null in zip(ordering, position, nullable):
+        name = field.lstrip("-")
+        descending = field.startswith("-")
+        if value is None:
+            # NULLs come last: only non-null values follow when descending
+            after = Q(**{f"{name}__isnull": False}) if descending else None
+            same = Q(**{f"{name}__isnull": True})
+        else:
+            after = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            if null and not descending:
+                after |= Q(**{f"{name}__isnull": True})
+            same = Q(**{name: value})
+        if after is not None:
+            clauses.append(equal & after)
+        equal &= same
+    return reduce(or_, clauses)
+
+
+def _position_value(obj, field):
+    *path, name = field.lstrip("-").split("__")
+    for part in path:
+        obj = getattr(obj, part)
+        if obj is None:
+            return None  # Through an empty nullable relation
+    value = obj.serializable_value(name)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()  # Keeps microseconds, unlike DjangoJSONEncoder
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = get_keyset_ordering(queryset)
+        self.count = self.get_count(queryset, request)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = _reverse(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*_order_by(ordering))
+        if position is not None:
+            nullable = [_nullable(queryset.model, field) for field in ordering]
+            try:
+                queryset = queryset.filter(_after(ordering, position, nullable))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode not in COUNT_MODES:
+            return None
+        if mode == "estimate" and connections[queryset.db].vendor == "postgresql":
+            return estimate_count(queryset)
+        return queryset.order_by().count()
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            ordering, position = payload["o"], list(payload["p"])
+            reverse = bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            ordering = position = None
+        if ordering != self.ordering or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if any(isinstance(value, (list, dict)) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse):
+        payload = {
+            "o": self.ordering,
+            "p": [_position_value(obj, field) for field in self.ordering],
+            "r": reverse,
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        # The total is asked for once, following pages skip the COUNT
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.count_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        body = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count is not None:
+            body = {"count": self.count, **body}
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "nullable": True},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
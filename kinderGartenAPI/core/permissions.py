@@ -40,3 +40,18 @@ class IsTenantMember(BasePermission):
         if tenant_field:
             return tenant_field == request.user.tenant
         return False
+
+
+class IsParentOfChild(BasePermission):
+    """Parents may only access their own children and objects attached to them"""
+
+    message = "You don't have access to this child."
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.role != "parent":
+            return True
+
+        from children.scope import get_parent_child_ids
+
+        child_id = obj.pk if obj._meta.model_name == "child" else obj.child_id
+        return child_id in get_parent_child_ids(request.user)
@@ -0,0 +1,20 @@
+from datetime import timedelta
+import logging
+
+from celery import shared_task
+
+from .media import purge_unreferenced
+
+logger = logging.getLogger("api")
+
+
+@shared_task
+def purge_unreferenced_media(hours=24):
+    """
+    Delete content-addressed files nothing references anymore (avatars
+    uploaded but never assigned), once left alone for `hours`.
+    """
+    count = purge_unreferenced(older_than=timedelta(hours=hours))
+    if count:
+        logger.info(f"🧹 Purged {count} unreferenced media files")
+    return count
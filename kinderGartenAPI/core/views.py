@@ -1,7 +1,46 @@
 # core/views.py
+import mimetypes
+import os
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.views.decorators.http import require_safe
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 
+from .media import CAS_PREFIX
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
 @api_view(["GET"])
 def root_view(request):
     return Response({"message": "KinderGarten API Root"})
+
+
+@require_safe
+def serve_media_blob(request, path):
+    """
+    Serve a content-addressed file. Its name is its hash, so it never
+    changes: clients and proxies may cache it for good.
+    """
+    name = CAS_PREFIX + path
+    etag = f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    try:
+        if not default_storage.exists(name):
+            raise Http404("File not found")
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            content_type = mimetypes.guess_type(name)[0]
+            response = FileResponse(
+                default_storage.open(name, "rb"),
+                content_type=content_type or "application/octet-stream",
+            )
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+
+    response["ETag"] = etag
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -12,4 +12,34 @@ app.conf.beat_schedule = {
         "task": "reports.tasks.clear_daily_reports",  # 👈 FIXED name
         "schedule": crontab(hour=0, minute=0),
     },
+    "reconcile-attendance-counters-nightly": {
+        "task": "attendance.tasks.reconcile_attendance_counters",
+        "schedule": crontab(hour=2, minute=0),
+        "args": (7,),
+    },
+    "maintain-attendance-partitions-daily": {
+        "task": "attendance.tasks.maintain_attendance_partitions",
+        "schedule": crontab(hour=3, minute=0),
+        "args": (3,),
+    },
+    "refresh-extra-hour-statements-nightly": {
+        "task": "attendance.tasks.generate_extra_hour_statements",
+        "schedule": crontab(hour=1, minute=30),
+        "args": (0,),
+    },
+    "close-extra-hour-statements-monthly": {
+        "task": "attendance.tasks.generate_extra_hour_statements",
+        "schedule": crontab(hour=1, minute=0, day_of_month=1),
+        "args": (1,),
+    },
+    "remind-payments-due-daily": {
+        "task": "children.tasks.remind_payments_due",
+        "schedule": crontab(hour=8, minute=0),
+        "args": (3,),
+    },
+    "purge-unreferenced-media-nightly": {
+        "task": "core.tasks.purge_unreferenced_media",
+        "schedule": crontab(hour=4, minute=0),
+        "args": (24,),
+    },
 }
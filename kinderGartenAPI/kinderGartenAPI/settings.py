@@ -186,6 +186,15 @@ else:
         }
     }
 
+# Attendance partitions older than N months are detached by the
+# maintain_attendance_partitions task (PostgreSQL, 0 = keep everything)
+ATTENDANCE_PARTITION_RETENTION_MONTHS = config(
+    "ATTENDANCE_PARTITION_RETENTION_MONTHS", default=0, cast=int
+)
+
+# Processes hashing parent passwords during enrollment imports (0 = one per CPU)
+ENROLLMENT_HASH_WORKERS = config("ENROLLMENT_HASH_WORKERS", default=0, cast=int)
+
 # ============================================================================
 # CACHE CONFIGURATION
 # ============================================================================
@@ -370,6 +379,11 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # Media files (User uploads)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Hash uploads while they stream in, for content-addressed storage (core.media)
+FILE_UPLOAD_HANDLERS = [
+    "core.media.HashingMemoryFileUploadHandler",
+    "core.media.HashingTemporaryFileUploadHandler",
+]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
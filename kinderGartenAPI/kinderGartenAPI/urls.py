@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from django.conf.urls.static import static
+from core.views import serve_media_blob
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -26,6 +27,12 @@ urlpatterns = [
     path("api/chat/", include("chat.urls")),
     path("api/planning/", include("planning.urls")),
     path("api/attendance/", include("attendance.urls")),
+    # Content-addressed uploads (core.media), served with immutable caching
+    path(
+        settings.MEDIA_URL.lstrip("/") + "cas/<path:path>",
+        serve_media_blob,
+        name="media-blob",
+    ),
 ]
 
 if settings.DEBUG:
@@ -1,12 +1,14 @@
 from rest_framework import serializers
+from core.fields import TenantPrimaryKeyRelatedField
+from core.fieldsets import SparseFieldsetsMixin
 from .models import WeeklyPlan, Event
 from children.models import ClassRoom
 from children.serializers import ClassRoomSerializer
 
 
 # -------- Event Serializer --------
-class EventSerializer(serializers.ModelSerializer):
-    classroom = serializers.PrimaryKeyRelatedField(
+class EventSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    classroom = TenantPrimaryKeyRelatedField(
         queryset=ClassRoom.objects.none(),
         write_only=True,
         required=False,
@@ -65,8 +67,8 @@ class EventSerializer(serializers.ModelSerializer):
 
 
 # -------- Weekly Plan Serializer --------
-class WeeklyPlanSerializer(serializers.ModelSerializer):
-    classroom = serializers.PrimaryKeyRelatedField(
+class WeeklyPlanSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    classroom = TenantPrimaryKeyRelatedField(
         queryset=ClassRoom.objects.none(), write_only=True
     )
     classroom_detail = ClassRoomSerializer(source="classroom", read_only=True)
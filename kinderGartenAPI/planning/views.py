@@ -6,15 +6,22 @@ import logging
 
 from .models import Event, WeeklyPlan
 from .serializers import EventSerializer, WeeklyPlanSerializer
+from core.fieldsets import SparseFieldsetsViewMixin
+from core.mixins import ConditionalGetMixin
+from core.pagination import KeysetPagination
 from core.permissions import IsTenantMember
 
 logger = logging.getLogger("api")
 
 
 # -------- Event ViewSet --------
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet
+):
     serializer_class = EventSerializer
+    conditional_timestamp_fields = ("updated_at", "classroom__updated_at")
     permission_classes = [IsAuthenticated, IsTenantMember]
+    pagination_class = KeysetPagination  # ✅ (date, id) cursors, no OFFSET
 
     def get_queryset(self):
         """✅ OPTIMIZED: Filtered by tenant and classroom"""
@@ -91,8 +98,11 @@ class EventViewSet(viewsets.ModelViewSet):
 
 
 # -------- Weekly Plan ViewSet --------
-class WeeklyPlanViewSet(viewsets.ModelViewSet):
+class WeeklyPlanViewSet(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet
+):
     serializer_class = WeeklyPlanSerializer
+    conditional_timestamp_fields = ("updated_at", "classroom__updated_at")
     permission_classes = [IsAuthenticated, IsTenantMember]
 
     def get_queryset(self):
@@ -0,0 +1,20 @@
+# Generated migration for resized report media variants
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0008_alter_dailyreport_child"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportmedia",
+            name="variants",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="Resized copies, see core.images"
+            ),
+        ),
+    ]
@@ -59,6 +59,9 @@ class ReportMedia(BaseTenantModel):
         verbose_name="Photo/Vidéo",
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    variants = models.JSONField(
+        default=dict, blank=True, help_text="Resized copies, see core.images"
+    )
 
     class Meta:
         verbose_name = "Fichier média du rapport"
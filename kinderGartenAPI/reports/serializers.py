@@ -1,17 +1,22 @@
 from rest_framework import serializers
+from core.fields import ImageVariantsField
+from core.fieldsets import SparseFieldsetsMixin
 from .models import DailyReport, ReportMedia
 
 
-class ReportMediaSerializer(serializers.ModelSerializer):
+class ReportMediaSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     # Return full URL (not relative path)
     file = serializers.FileField(use_url=True)
+    # ✅ Resized copies for galleries (None until generated, or for videos)
+    thumbnail = ImageVariantsField(source="variants", variant="thumb")
+    medium = ImageVariantsField(source="variants", variant="medium")
 
     class Meta:
         model = ReportMedia
-        fields = ["id", "file", "uploaded_at"]
+        fields = ["id", "file", "thumbnail", "medium", "uploaded_at"]
 
 
-class DailyReportSerializer(serializers.ModelSerializer):
+class DailyReportSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     child_name = serializers.CharField(source="child.name", read_only=True)
     media_files = ReportMediaSerializer(many=True, read_only=True)
 
@@ -0,0 +1,22 @@
+"""
+Release the stored file of deleted report media, also when a report (and
+its media) is deleted in cascade.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from core.images import delete_variants
+from core.media import release_media
+from .models import ReportMedia
+
+
+@receiver(post_delete, sender=ReportMedia)
+def release_report_media(sender, instance, **kwargs):
+    name, variants = instance.file.name, instance.variants
+    if name and not release_media(name):
+        # Uploaded before content addressing, owned by this row alone
+        storage = instance.file.storage
+        transaction.on_commit(lambda: storage.delete(name))
+    transaction.on_commit(lambda: delete_variants(variants))
@@ -5,7 +5,8 @@ from datetime import timedelta
 from zoneinfo import ZoneInfo
 import logging
 
-from .models import DailyReport
+from core.images import generate_variants
+from .models import DailyReport, ReportMedia
 
 logger = logging.getLogger("api")
 
@@ -45,3 +46,24 @@ def archive_old_daily_reports(days=30):
     except Exception as e:
         logger.error(f"❌ Error archiving reports: {e}", exc_info=True)
         raise
+
+
+@shared_task
+def generate_report_media_variants(media_id):
+    """Resize a report photo into thumb/medium WebP and JPEG copies"""
+    media = ReportMedia.objects.filter(pk=media_id).only("file", "report").first()
+    if media is None or not media.file:
+        return None
+
+    try:
+        variants = generate_variants(media.file.name)
+    except (OSError, ValueError) as e:
+        logger.info(f"No variants for report media {media_id}: {e}")  # e.g. videos
+        return None
+
+    now = timezone.now()
+    ReportMedia.objects.filter(pk=media_id).update(variants=variants, updated_at=now)
+    # ✅ Report ETags are built from the report's updated_at
+    DailyReport.objects.filter(pk=media.report_id).update(updated_at=now)
+    logger.info(f"🖼️ Generated variants for report media {media_id}")
+    return variants
@@ -3,23 +3,34 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db import transaction
 from django.db.utils import IntegrityError
+from django.utils import timezone
 import logging
 
 from .models import DailyReport, ReportMedia
 from .serializers import DailyReportSerializer
+from .tasks import generate_report_media_variants
 from rest_framework.parsers import MultiPartParser, FormParser
 from core.validators import validate_file_upload, MAX_FILE_SIZE
+from core.fieldsets import SparseFieldsetsViewMixin
+from core.images import schedule_variants
+from core.media import store_upload
+from core.mixins import ConditionalGetMixin
+from core.pagination import KeysetPagination
 from core.permissions import IsTenantMember
 
 logger = logging.getLogger("api")
 
 
-class DailyReportListCreateView(generics.ListCreateAPIView):
+class DailyReportListCreateView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.ListCreateAPIView
+):
     """✅ OPTIMIZED: Query optimization with select_related + prefetch_related"""
 
     parser_classes = [MultiPartParser, FormParser]
     serializer_class = DailyReportSerializer
+    conditional_timestamp_fields = ("updated_at", "child__updated_at")
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination  # ✅ (-created_at, id) cursors, no OFFSET
 
     def get_queryset(self):
         """✅ Prevent N+1 queries"""
@@ -71,7 +82,11 @@ class DailyReportListCreateView(generics.ListCreateAPIView):
                                 "video/quicktime",
                             },
                         )
-                        ReportMedia.objects.create(report=report, file=f, tenant=tenant)
+                        blob = store_upload(f, tenant)
+                        media = ReportMedia.objects.create(
+                            report=report, file=blob.file.name, tenant=tenant
+                        )
+                        schedule_variants(generate_report_media_variants, media.id)
                     except Exception as e:
                         logger.warning(f"Failed to save media file: {e}")
 
@@ -106,11 +121,14 @@ class DailyReportListCreateView(generics.ListCreateAPIView):
             )
 
 
-class DailyReportDetailView(generics.RetrieveUpdateDestroyAPIView):
+class DailyReportDetailView(
+    ConditionalGetMixin, SparseFieldsetsViewMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """✅ OPTIMIZED: Retrieve, update or delete report"""
 
     parser_classes = [MultiPartParser, FormParser]
     serializer_class = DailyReportSerializer
+    conditional_timestamp_fields = ("updated_at", "child__updated_at")
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
 
     def get_queryset(self):
@@ -149,9 +167,11 @@ class DailyReportDetailView(generics.RetrieveUpdateDestroyAPIView):
                                 "video/quicktime",
                             },
                         )
-                        ReportMedia.objects.create(
-                            report=report, file=f, tenant=report.tenant
+                        blob = store_upload(f, report.tenant)
+                        media = ReportMedia.objects.create(
+                            report=report, file=blob.file.name, tenant=report.tenant
                         )
+                        schedule_variants(generate_report_media_variants, media.id)
                     except Exception as e:
                         logger.warning(f"Failed to save media file: {e}")
 
@@ -185,11 +205,10 @@ class ReportMediaDeleteView(generics.DestroyAPIView):
         report_id = instance.report.id
         logger.info(f"Deleting media file {instance.id} from report {report_id}")
 
-        # Delete the file from storage
-        if instance.file:
-            instance.file.delete(save=False)
-
+        # ✅ Files and variants are released by reports.signals
         instance.delete()
+        # ✅ Report ETags are built from updated_at, which delete() leaves alone
+        DailyReport.objects.filter(pk=report_id).update(updated_at=timezone.now())
         logger.info(f"Deleted media file {instance.id}")
 
     def destroy(self, request, *args, **kwargs):
@@ -3,6 +3,9 @@ Comprehensive unit tests for the refactored Django project
 Tests cover: views, serializers, models, permissions, validators
 """
 
+import base64
+import json
+from unittest import mock
 import pytest
 from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
@@ -11,13 +14,16 @@ from rest_framework import status
 from datetime import date, timedelta
 from core.models import Tenant, BaseTenantModel
 from children.models import Child, ClassRoom, Club
-from attendance.models import AttendanceRecord, ExtraHourRequest
+from attendance.models import AttendanceRecord, ExtraHourRequest, ExtraHourStatement
 from reports.models import DailyReport, ReportMedia
 from chat.models import Conversation, Message
 from core.permissions import IsTenantAdmin, IsTenantParent, IsTenantMember
 from core.validators import validate_file_upload
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
@@ -27,6 +33,12 @@ User = get_user_model()
 # ============================================================================
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached summaries and parent scopes must not leak between tests"""
+    cache.clear()
+
+
 @pytest.fixture
 def tenant():
     """Create a test tenant"""
@@ -282,6 +294,869 @@ class TestChildrenViews(APITestCase):
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
 
+    def test_parent_scope_is_cached_and_follows_reassignment(self):
+        """Parent views use the cached child ids, refreshed on parent changes"""
+        from children.scope import get_parent_child_ids
+
+        child = Child.objects.create(
+            tenant=self.tenant,
+            name="My Child",
+            parent_name="Me",
+            parent_user=self.parent_user,
+            classroom=self.classroom,
+        )
+        other = Child.objects.create(
+            tenant=self.tenant, name="Sibling", parent_name="Me", classroom=self.classroom
+        )
+
+        assert get_parent_child_ids(self.parent_user) == [child.id]
+        with CaptureQueriesContext(connection) as queries:
+            get_parent_child_ids(self.parent_user)
+        assert len(queries) == 0
+
+        other.parent_user = self.parent_user
+        other.save()
+        self.client.force_authenticate(user=self.parent_user)
+        response = self.client.get("/api/children/")
+        assert len(response.data["results"]) == 2
+
+        # Detail of a child outside the scope is hidden
+        other.parent_user = None
+        other.save()
+        response = self.client.get(f"/api/children/{other.id}/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_child_list_keyset_pagination(self):
+        """Cursor links walk (name, id) order without gaps or duplicates"""
+        for name in ["Eve", "Bob", "Dan", "Bob", "Ann"]:
+            Child.objects.create(
+                tenant=self.tenant, name=name, parent_name="P", classroom=self.classroom
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get("/api/children/", {"page_size": 2, "count": "exact"})
+        assert response.data["count"] == 5
+        assert response.data["previous"] is None
+
+        names, pages = [], [response]
+        while response.data["next"]:
+            names += [child["name"] for child in response.data["results"]]
+            response = self.client.get(response.data["next"])
+            pages.append(response)
+        names += [child["name"] for child in response.data["results"]]
+        assert names == ["Ann", "Bob", "Bob", "Dan", "Eve"]
+        assert "count" not in response.data
+
+        previous = self.client.get(pages[-1].data["previous"])
+        assert previous.data["results"] == pages[-2].data["results"]
+        assert self.client.get("/api/children/", {"cursor": "bogus"}).status_code == 404
+
+        estimate = self.client.get("/api/children/", {"count": "estimate"})
+        assert isinstance(estimate.data["count"], int)
+
+    def test_keyset_pagination_orders_nullable_fields(self):
+        """Cursors over a nullable ordering field walk NULL rows both ways"""
+        for name, birthdate in [
+            ("Ann", None),
+            ("Bob", date(2020, 5, 1)),
+            ("Cid", None),
+            ("Dan", date(2019, 1, 1)),
+        ]:
+            Child.objects.create(
+                tenant=self.tenant,
+                name=name,
+                parent_name="P",
+                classroom=self.classroom,
+                birthdate=birthdate,
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+        for ordering, expected in [
+            ("birthdate", ["Dan", "Bob", "Ann", "Cid"]),
+            ("-birthdate", ["Ann", "Cid", "Bob", "Dan"]),
+        ]:
+            response = self.client.get(
+                "/api/children/", {"ordering": ordering, "page_size": 1}
+            )
+            names = [child["name"] for child in response.data["results"]]
+            while response.data["next"]:
+                response = self.client.get(response.data["next"])
+                assert response.status_code == status.HTTP_200_OK
+                names += [child["name"] for child in response.data["results"]]
+            assert names == expected
+
+            previous = self.client.get(response.data["previous"])
+            assert [c["name"] for c in previous.data["results"]] == expected[-2:-1]
+
+        bad_value = base64.urlsafe_b64encode(
+            json.dumps({"o": ["name", "id"], "p": ["Ann", "x"], "r": False}).encode()
+        ).decode()
+        assert self.client.get("/api/children/", {"cursor": bad_value}).status_code == 404
+
+    def test_child_search_is_ranked_and_follows_updates(self):
+        """Search matches names and contacts, stays in sync and in tenant"""
+        from children.search import has_search_index, install_search_index
+
+        install_search_index(connection)
+        amira = Child.objects.create(
+            tenant=self.tenant, name="Amira", parent_name="Sami Trabelsi"
+        )
+        sam = Child.objects.create(tenant=self.tenant, name="Sam", parent_name="Leila")
+        other = Tenant.objects.create(name="Other", slug="other")
+        Child.objects.create(tenant=other, name="Samir", parent_name="X")
+        self.client.force_authenticate(user=self.admin_user)
+
+        def search(q):
+            response = self.client.get("/api/children/search/", {"q": q})
+            return [child["id"] for child in response.data["results"]]
+
+        assert set(search("sam")) == {amira.id, sam.id}
+        assert search("trab") == [amira.id]
+        assert search("") == []
+
+        amira.parent_name = "Nour"
+        amira.save()
+        assert search("trab") == []
+        if connection.vendor == "sqlite":
+            assert has_search_index(connection)
+
+    def test_classroom_students_count_follows_children(self):
+        """students_count tracks creates, moves and deletes; drift is repaired"""
+        from children.counters import rebuild_students_counts
+
+        other_class = ClassRoom.objects.create(tenant=self.tenant, name="Class B")
+        first = Child.objects.create(
+            tenant=self.tenant, name="A", parent_name="P", classroom=self.classroom
+        )
+        Child.objects.create(
+            tenant=self.tenant, name="B", parent_name="P", classroom=self.classroom
+        )
+
+        first.classroom = other_class
+        first.save()
+        self.classroom.refresh_from_db()
+        other_class.refresh_from_db()
+        assert (self.classroom.students_count, other_class.students_count) == (1, 1)
+
+        first.delete()
+        other_class.refresh_from_db()
+        assert other_class.students_count == 0
+
+        ClassRoom.objects.filter(pk=self.classroom.pk).update(students_count=7)
+        assert rebuild_students_counts(self.tenant.id) == [self.classroom.id]
+        self.classroom.refresh_from_db()
+        assert self.classroom.students_count == 1
+
+    def test_enrollment_import_creates_children_and_accounts(self):
+        """CSV enrollment bulk-creates rows, accounts and club links"""
+        from django.contrib.auth.hashers import check_password
+        from children.enrollment import hash_passwords
+
+        club = Club.objects.create(tenant=self.tenant, name="Music")
+        User.objects.create_user(username="amira", password="x", tenant=self.tenant)
+        csv_file = SimpleUploadedFile(
+            "children.csv",
+            b"name,parent_name,classroom,clubs,has_mobile_app\n"
+            b"Amira,Sami,Class A,Music,yes\n"
+            b"Youssef,,Class Z,,no\n"
+            b"Lina,Nour,,,\n",
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            "/api/children/import/", {"file": csv_file}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert (response.data["created"], response.data["rejected"]) == (2, 1)
+        amira_row, error_row, _ = response.data["rows"]
+        assert len(error_row["errors"]) == 2
+        amira = Child.objects.get(pk=amira_row["child_id"])
+        assert amira_row["username"].startswith("amira_")
+        assert amira.parent_user.check_password(amira_row["password"])
+        assert list(amira.clubs.all()) == [club]
+        self.classroom.refresh_from_db()
+        assert self.classroom.students_count == 1
+
+        hashes = hash_passwords(["a", "b", "c", "d"], workers=2)
+        assert all(check_password(p, h) for p, h in zip("abcd", hashes))
+
+    def test_enrollment_rows_are_validated_against_the_model(self):
+        """Values the columns cannot hold are per-row errors, not a failed import"""
+        from children.enrollment import enroll_children
+
+        rows = [
+            {"name": "Amira", "parent_name": "Sami", "gender": "x" * 50},
+            {"name": "N" * 200, "parent_name": "Sami"},
+            {"name": "Lina", "parent_name": "Nour", "gender": "F"},
+        ]
+
+        result = enroll_children(rows, self.tenant)
+
+        assert (result["created"], result["rejected"]) == (1, 2)
+        gender_row, name_row, created = result["rows"]
+        assert gender_row["errors"][0].startswith("gender: ")
+        assert name_row["errors"][0].startswith("name: ")
+        assert Child.objects.get(pk=created["child_id"]).name == "Lina"
+
+    def test_enrollment_usernames_scale_to_the_row_limit(self):
+        """Usernames for a full import are allocated in a few flat queries"""
+        from children.enrollment import MAX_ENROLLMENT_ROWS, allocate_usernames
+
+        User.objects.create_user(username="kid-7", password="x", tenant=self.tenant)
+        names = [f"Kid {i}" for i in range(MAX_ENROLLMENT_ROWS - 1)] + ["Kid 7"]
+
+        with CaptureQueriesContext(connection) as queries:
+            usernames = allocate_usernames(names)
+
+        assert len(queries) <= 3
+        assert len(set(usernames)) == len(names)
+        assert usernames[0] == "kid-0"
+        assert usernames[7].startswith("kid-7_") and usernames[-1].startswith("kid-7_")
+
+    def test_enrollment_survives_username_races_and_caps_rows(self):
+        """A username taken before the INSERT is reallocated; big files stop early"""
+        from children import enrollment
+
+        User.objects.create_user(username="amira", password="x", tenant=self.tenant)
+        allocate = enrollment.allocate_usernames
+        stale = iter([["amira"]])  # As if "amira" was free when allocated
+        rows = [{"name": "Amira", "parent_name": "Sami", "has_mobile_app": "yes"}]
+
+        with mock.patch.object(
+            enrollment,
+            "allocate_usernames",
+            side_effect=lambda names: next(stale, None) or allocate(names),
+        ):
+            result = enrollment.enroll_children(rows, self.tenant)
+        assert result["created"] == 1
+        assert result["rows"][0]["username"].startswith("amira_")
+
+        limit = enrollment.MAX_ENROLLMENT_ROWS
+        csv_file = SimpleUploadedFile(
+            "children.csv", b"name,parent_name\n" + b"Kid,Parent\n" * (limit + 5)
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(
+            "/api/children/import/", {"file": csv_file}, format="multipart"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(limit) in response.data["error"]
+
+    def test_sparse_fieldsets_prune_fields_and_queries(self):
+        """?fields= / ?exclude= trim the payload and the SQL behind it"""
+        child = Child.objects.create(
+            tenant=self.tenant, name="Amira", parent_name="P", classroom=self.classroom
+        )
+        child.clubs.add(Club.objects.create(tenant=self.tenant, name="Music"))
+        self.client.force_authenticate(user=self.admin_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/children/", {"fields": "id,name,avatar"})
+        assert list(response.data["results"][0]) == ["id", "name", "avatar"]
+        assert not any("children_club" in q["sql"] for q in queries)
+        (page_sql,) = [q["sql"] for q in queries if "LIMIT" in q["sql"]]
+        assert "JOIN" not in page_sql and "allergies" not in page_sql
+
+        response = self.client.get("/api/children/", {"fields": "id,classroom_name"})
+        assert response.data["results"][0]["classroom_name"] == "Class A"
+
+        response = self.client.get(
+            f"/api/children/{child.id}/", {"exclude": "club_details,allergies"}
+        )
+        assert "club_details" not in response.data
+        assert response.data["clubs"] and "allergies" not in response.data
+
+    def test_child_clubs_are_resolved_in_one_tenant_scoped_query(self):
+        """Submitted club ids are validated with a single IN query"""
+        clubs = [
+            Club.objects.create(tenant=self.tenant, name=f"Club {i}") for i in range(3)
+        ]
+        other = Tenant.objects.create(name="Other", slug="other")
+        foreign = Club.objects.create(tenant=other, name="Foreign")
+        self.client.force_authenticate(user=self.admin_user)
+
+        payload = {"name": "Amira", "parent_name": "P"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/api/children/",
+                {**payload, "clubs": [club.id for club in clubs]},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert sorted(response.data["clubs"]) == sorted(club.id for club in clubs)
+        club_lookups = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith('SELECT "children_club"') and " IN " in q["sql"]
+        ]
+        assert len(club_lookups) == 1
+
+        response = self.client.post(
+            "/api/children/",
+            {**payload, "clubs": [clubs[0].id, foreign.id]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "clubs" in response.data
+
+    def test_conditional_get_answers_304_until_data_changes(self):
+        """ETag / Last-Modified revalidation on child list and detail"""
+        child = Child.objects.create(
+            tenant=self.tenant, name="Amira", parent_name="P", classroom=self.classroom
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get("/api/children/")
+        etag = response["ETag"]
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header("Last-Modified")  # Blind to deletions
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/children/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not any("LIMIT" in q["sql"] for q in queries)  # Nothing serialized
+
+        # Renaming the classroom changes the embedded classroom_name
+        self.classroom.name = "Class B"
+        self.classroom.save()
+        response = self.client.get("/api/children/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+        # Deleting a row changes the count even if no timestamp moves
+        lina = Child.objects.create(tenant=self.tenant, name="Lina", parent_name="P")
+        Child.objects.create(tenant=self.tenant, name="Zed", parent_name="P")
+        etag = self.client.get("/api/children/")["ETag"]
+        lina.delete()
+        response = self.client.get("/api/children/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+        detail = self.client.get(f"/api/children/{child.id}/")
+        response = self.client.get(
+            f"/api/children/{child.id}/", HTTP_IF_NONE_MATCH=detail["ETag"]
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = self.client.get(
+            f"/api/children/{child.id}/",
+            HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"],
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_avatar_variants_are_resized_and_stripped(self):
+        """Avatar thumbnails are small, EXIF-free and listed with the child"""
+        import io
+        import tempfile
+        from django.core.files.storage import default_storage
+        from django.test import override_settings
+        from PIL import Image
+        from children.tasks import generate_avatar_variants
+
+        photo = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        Image.new("RGB", (1200, 900), "orange").save(photo, "JPEG", exif=exif)
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root
+        ):
+            path = default_storage.save("avatars/test/photo.jpg", photo)
+            child = Child.objects.create(
+                tenant=self.tenant,
+                name="Amira",
+                parent_name="P",
+                avatar=f"http://testserver/media/{path}",
+            )
+            generate_avatar_variants(child.id)
+
+            child.refresh_from_db()
+            assert set(child.avatar_variants) == {"thumb", "medium"}
+            with default_storage.open(child.avatar_variants["thumb"]["jpeg"]) as fp:
+                thumb = Image.open(fp)
+                assert max(thumb.size) == 160 and not thumb.getexif()
+            assert default_storage.exists(child.avatar_variants["medium"]["webp"])
+
+            self.client.force_authenticate(user=self.admin_user)
+            response = self.client.get("/api/children/")
+            thumb_urls = response.data["results"][0]["avatar_thumb"]
+            assert thumb_urls["webp"].endswith("photo_thumb.webp")
+
+            # A new avatar invalidates the old variants
+            child.avatar = "https://cdn.example.com/other.jpg"
+            child.save()
+            assert child.avatar_variants == {}
+            assert generate_avatar_variants(child.id) is None
+
+    def test_uploads_are_stored_once_per_content(self):
+        """Identical uploads share one blob, counted and served as immutable"""
+        import io
+        import tempfile
+        from django.core.files.storage import default_storage
+        from django.test import override_settings
+        from PIL import Image
+        from core.models import MediaBlob
+
+        photo = io.BytesIO()
+        Image.new("RGB", (64, 64), "teal").save(photo, "PNG")
+
+        def upload(name):
+            file_obj = SimpleUploadedFile(name, photo.getvalue(), "image/png")
+            response = self.client.post(
+                "/api/children/upload-avatar/", {"file": file_obj}, format="multipart"
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            return response.data["url"]
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root
+        ):
+            self.client.force_authenticate(user=self.admin_user)
+            url = upload("a.png")
+            assert upload("b.png") == url and "/media/cas/test-org/" in url
+            blob = MediaBlob.objects.get(tenant=self.tenant)
+            assert blob.refcount == 0
+
+            children = [
+                Child.objects.create(
+                    tenant=self.tenant, name=name, parent_name="P", avatar=url
+                )
+                for name in ("Amira", "Selim")
+            ]
+            blob.refresh_from_db()
+            assert blob.refcount == 2
+
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert "immutable" in response["Cache-Control"]
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+            children[0].avatar = ""
+            children[0].save()
+            with self.captureOnCommitCallbacks(execute=True):
+                children[1].delete()
+            assert not MediaBlob.objects.exists()
+            assert not default_storage.exists(blob.file.name)
+
+    def test_classroom_dashboard_is_one_cached_query(self):
+        """Dashboard figures per classroom come from a single query, then cache"""
+        from datetime import time
+        from django.utils import timezone
+        from planning.models import Event
+
+        cache.clear()
+        today = timezone.localdate()
+        kids = [
+            Child.objects.create(
+                tenant=self.tenant,
+                name=f"Kid {i}",
+                parent_name="P",
+                classroom=self.classroom,
+            )
+            for i in range(3)
+        ]
+        AttendanceRecord.objects.create(tenant=self.tenant, child=kids[0], date=today)
+        AttendanceRecord.objects.create(
+            tenant=self.tenant, child=kids[1], date=today, status="absent"
+        )
+        ExtraHourRequest.objects.create(
+            tenant=self.tenant, child=kids[0], start=time(17), end=time(18)
+        )
+        DailyReport.objects.create(tenant=self.tenant, child=kids[0], date=today)
+        Event.objects.create(
+            tenant=self.tenant,
+            title="Trip",
+            classroom=self.classroom,
+            date=timezone.now() + timedelta(days=1),
+        )
+        ClassRoom.objects.create(tenant=self.tenant, name="Class B")
+
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/children/classes/dashboard/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [q["sql"].split()[0] for q in queries].count("SELECT") == 1
+
+        class_a, class_b = response.data["classrooms"]
+        assert class_a["children_count"] == 3
+        assert class_a["attendance"] == {"present": 1, "absent": 1, "unmarked": 1}
+        assert class_a["pending_extra_hours"] == 1
+        assert class_a["reports"] == {"submitted": 1, "pending": 2}
+        assert class_a["upcoming_events"] == 1
+        assert class_b["attendance"]["present"] == 0 and class_b["children_count"] == 0
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/children/classes/dashboard/")
+        assert [q["sql"].split()[0] for q in queries].count("SELECT") == 0
+
+        self.client.force_authenticate(user=self.parent_user)
+        response = self.client.get("/api/children/classes/dashboard/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_club_members_bulk_add_and_remove(self):
+        """Club membership edits are bulk, idempotent and return the diff"""
+        club = Club.objects.create(tenant=self.tenant, name="Music")
+        kids = [
+            Child.objects.create(tenant=self.tenant, name=f"Kid {i}", parent_name="P")
+            for i in range(3)
+        ]
+        kids[0].clubs.add(club)
+        url = f"/api/children/clubs/{club.id}/members/"
+
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url, {"add": [kid.id for kid in kids]}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["added"] == sorted([kids[1].id, kids[2].id])
+        assert response.data["removed"] == []
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 1
+        assert set(club.children.values_list("id", flat=True)) == {
+            kid.id for kid in kids
+        }
+
+        # Same edit again changes nothing
+        response = self.client.post(url, {"add": [kids[1].id]}, format="json")
+        assert response.data["added"] == []
+
+        response = self.client.post(
+            url, {"remove": [kids[0].id, kids[1].id]}, format="json"
+        )
+        assert response.data["removed"] == sorted([kids[0].id, kids[1].id])
+        assert list(club.children.values_list("id", flat=True)) == [kids[2].id]
+
+        other_tenant = Tenant.objects.create(name="Other", slug="other")
+        stranger = Child.objects.create(tenant=other_tenant, name="X", parent_name="P")
+        response = self.client.post(url, {"add": [stranger.id]}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        self.client.force_authenticate(user=self.parent_user)
+        response = self.client.post(url, {"add": [kids[0].id]}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_payments_due_and_batched_reminders(self):
+        """Due payments are listed by range and reminded once, in bulk"""
+        from django.utils import timezone
+        from children.models import PaymentReminder
+        from children.payments import send_payment_reminders
+
+        today = timezone.localdate()
+        parents = [
+            User.objects.create_user(
+                username=f"p{i}", password="x", tenant=self.tenant, role="parent"
+            )
+            for i in range(3)
+        ]
+        for i, parent in enumerate(parents):
+            Child.objects.create(
+                tenant=self.tenant,
+                name=f"Due {i}",
+                parent_name="P",
+                parent_user=parent,
+                next_payment_date=today + timedelta(days=i),
+            )
+        Child.objects.create(
+            tenant=self.tenant,
+            name="No account",
+            parent_name="P",
+            next_payment_date=today + timedelta(days=1),
+        )
+        Child.objects.create(
+            tenant=self.tenant,
+            name="Later",
+            parent_name="P",
+            next_payment_date=today + timedelta(days=30),
+        )
+        Child.objects.create(
+            tenant=self.tenant,
+            name="Late",
+            parent_name="P",
+            next_payment_date=today - timedelta(days=2),
+        )
+        closed = Tenant.objects.create(name="Closed", slug="closed", is_active=False)
+        Child.objects.create(
+            tenant=closed, name="Gone", parent_name="P", next_payment_date=today
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            assert send_payment_reminders(days=3) == {self.tenant.id: 4}
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 3  # Conversations, messages, ledger
+        assert Message.objects.filter(sender=self.admin_user).count() == 3
+        assert not PaymentReminder.objects.get(child__name="No account").notified
+        assert send_payment_reminders(days=3) == {}  # Once per due date
+
+        from children.tasks import remind_payments_due, remind_tenant_payments_due
+
+        with mock.patch.object(remind_tenant_payments_due, "delay") as delay:
+            assert remind_payments_due(days=3) == 1  # Inactive tenants skipped
+        delay.assert_called_once_with(self.tenant.id, today.isoformat(), 3)
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get("/api/children/payments-due/?days=3")
+        assert response.status_code == status.HTTP_200_OK
+        rows = {row["name"]: row for row in response.data["results"]}
+        assert set(rows) == {"Late", "Due 0", "Due 1", "Due 2", "No account"}
+        assert rows["Late"]["overdue"] and not rows["Late"]["reminded"]
+        assert rows["Due 1"]["reminded"] and not rows["Due 1"]["overdue"]
+        assert not rows["No account"]["reminded"]
+
+        response = self.client.get("/api/children/payments-due/?days=abc")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_classroom_promotion_moves_children_once(self):
+        """Promotion moves whole classrooms with one UPDATE per mapping"""
+        class_b = ClassRoom.objects.create(tenant=self.tenant, name="Class B")
+        class_c = ClassRoom.objects.create(tenant=self.tenant, name="Class C")
+        small = [
+            Child.objects.create(
+                tenant=self.tenant,
+                name=f"A{i}",
+                parent_name="P",
+                classroom=self.classroom,
+            )
+            for i in range(3)
+        ]
+        middle = Child.objects.create(
+            tenant=self.tenant, name="B0", parent_name="P", classroom=class_b
+        )
+        senior = Child.objects.create(
+            tenant=self.tenant, name="C0", parent_name="P", classroom=class_c
+        )
+        mapping = {
+            str(self.classroom.id): class_b.id,
+            str(class_b.id): class_c.id,
+            str(class_c.id): None,
+        }
+        url = "/api/children/classes/promote/"
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            url, {"mapping": mapping, "dry_run": True}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["moved"] == 5
+        assert response.data["moves"][0]["children"] == [kid.id for kid in small]
+        middle.refresh_from_db()
+        assert middle.classroom_id == class_b.id  # Nothing written
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"mapping": mapping}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        child_updates = [
+            q for q in queries if q["sql"].startswith('UPDATE "children_child"')
+        ]
+        assert len(child_updates) == 3
+
+        assert set(
+            Child.objects.filter(classroom=class_b).values_list("id", flat=True)
+        ) == {kid.id for kid in small}
+        middle.refresh_from_db()
+        senior.refresh_from_db()
+        assert middle.classroom_id == class_c.id and senior.classroom_id is None
+        counts = dict(ClassRoom.objects.values_list("id", "students_count"))
+        assert counts == {self.classroom.id: 0, class_b.id: 3, class_c.id: 1}
+
+        other = ClassRoom.objects.create(
+            tenant=Tenant.objects.create(name="Other", slug="other"), name="X"
+        )
+        response = self.client.post(
+            url, {"mapping": {str(other.id): class_b.id}}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_whereabouts_finds_children_in_running_sessions(self):
+        """Children are located in their running club session or classroom"""
+        from datetime import datetime, time
+        from children.models import ClubSession
+
+        music = Club.objects.create(tenant=self.tenant, name="Music")
+        chess = Club.objects.create(tenant=self.tenant, name="Chess")
+        at = datetime(2025, 10, 27, 15, 30)  # A Monday
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(
+            "/api/children/clubs/sessions/",
+            {
+                "club": music.id,
+                "weekday": at.weekday(),
+                "start_time": "15:00",
+                "end_time": "16:00",
+                "room": "Studio",
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        ClubSession.objects.create(
+            tenant=self.tenant,
+            club=chess,
+            weekday=at.weekday(),
+            start_time=time(16),
+            end_time=time(17),
+        )
+        singer, player, idle = [
+            Child.objects.create(
+                tenant=self.tenant,
+                name=name,
+                parent_name="P",
+                classroom=self.classroom,
+            )
+            for name in ("Singer", "Player", "Idle")
+        ]
+        singer.clubs.add(music)
+        player.clubs.add(chess)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/children/whereabouts/", {"at": at.isoformat()}
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert len([q for q in queries if " FROM " in q["sql"]]) == 1
+        (session,) = response.data["sessions"]
+        assert session["club"] == "Music" and session["room"] == "Studio"
+        assert [child["id"] for child in session["children"]] == [singer.id]
+        (classroom,) = response.data["classrooms"]
+        assert {child["id"] for child in classroom["children"]} == {player.id, idle.id}
+
+        response = self.client.post(
+            "/api/children/clubs/sessions/",
+            {
+                "club": music.id,
+                "weekday": 0,
+                "start_time": "16:00",
+                "end_time": "15:00",
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        sessions = "/api/children/clubs/sessions/"
+        response = self.client.get(sessions, {"club": music.id, "weekday": 0})
+        assert [row["weekday"] for row in response.data["results"]] == [0]
+        for params in [{"club": "abc"}, {"weekday": "x"}, {"weekday": 7}]:
+            response = self.client.get(sessions, params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_classroom_growth_percentiles(self):
+        """Batched measurements give cached LMS percentiles per classroom"""
+        import io
+        from children.growth import load_reference
+        from children.models import GrowthMeasurement
+
+        # Made-up curve: median 10 kg at birth to 20 kg at day 1000, L = 1
+        table = io.StringIO("Day\tL\tM\tS\n0\t1\t10\t0.1\n1000\t1\t20\t0.1\n")
+        assert load_reference(table, "weight_for_age", "M") == 2
+        cache.clear()
+
+        birthdate = date(2022, 1, 1)
+        kids = [
+            Child.objects.create(
+                tenant=self.tenant,
+                name=name,
+                parent_name="P",
+                gender=gender,
+                birthdate=birthdate,
+                classroom=self.classroom,
+            )
+            for name, gender in (("Adam", "M"), ("Badr", "boy"), ("Lina", "F"))
+        ]
+        measured_on = (birthdate + timedelta(days=500)).isoformat()  # M = 15 kg
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/api/children/measurements/",
+                [
+                    {"child": kid.id, "measured_on": measured_on, "weight": weight}
+                    for kid, weight in zip(kids, ("15", "16.5", "14"))
+                ],
+                format="json",
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data == {"recorded": 3}
+        child_lookups = [
+            q for q in queries if q["sql"].startswith('SELECT "children_child"."id"')
+        ]
+        assert len(child_lookups) == 2  # Row validation, then latest values
+        assert GrowthMeasurement.objects.count() == 3
+        kids[1].refresh_from_db()
+        assert float(kids[1].weight) == 16.5
+
+        url = f"/api/children/classes/{self.classroom.id}/growth/"
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        rows = {row["name"]: row for row in response.data["children"]}
+        assert rows["Adam"]["weight_for_age"] == {"z": 0.0, "percentile": 50.0}
+        # z = (16.5 / 15 - 1) / (1 * 0.1) = 1
+        assert rows["Badr"]["weight_for_age"] == {"z": 1.0, "percentile": 84.1}
+        assert rows["Lina"]["weight_for_age"]["z"] is None  # No female curve
+        assert rows["Adam"]["height_for_age"]["percentile"] is None
+
+        with CaptureQueriesContext(connection) as queries:
+            assert self.client.get(url).data == response.data
+        assert not any("JSON_OBJECT" in q["sql"] for q in queries)  # Cached
+
+        self.client.post(
+            "/api/children/measurements/",
+            {"child": kids[0].id, "measured_on": measured_on, "weight": "16.5"},
+            format="json",
+        )
+        rows = {row["name"]: row for row in self.client.get(url).data["children"]}
+        assert rows["Adam"]["weight_for_age"]["z"] == 1.0
+
+    def test_growth_measurement_repost_keeps_other_value(self):
+        """Re-posting one value for a day leaves the other stored value alone"""
+        from children.models import GrowthMeasurement
+
+        child = Child.objects.create(
+            tenant=self.tenant, name="Adam", parent_name="P", classroom=self.classroom
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        def post(data):
+            base = {"child": child.id, "measured_on": "2025-01-10"}
+            response = self.client.post(
+                "/api/children/measurements/", [{**base, **data}], format="json"
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        post({"weight": "15", "height": "100"})
+        post({"height": "101"})
+
+        measurement = GrowthMeasurement.objects.get(child=child)
+        assert (float(measurement.weight), float(measurement.height)) == (15, 101)
+        child.refresh_from_db()
+        assert (float(child.weight), float(child.height)) == (15, 101)
+
+        history = self.client.get("/api/children/measurements/", {"child": child.id})
+        assert [row["height"] for row in history.data["results"]] == ["101.00"]
+        response = self.client.get("/api/children/measurements/", {"child": "abc"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_growth_measurement_batch_merges_repeated_days(self):
+        """A batch repeating a child and day is merged, later values winning"""
+        from children.models import GrowthMeasurement
+
+        child = Child.objects.create(
+            tenant=self.tenant, name="Adam", parent_name="P", classroom=self.classroom
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        base = {"child": child.id, "measured_on": "2025-01-10"}
+
+        response = self.client.post(
+            "/api/children/measurements/",
+            [
+                {**base, "weight": "15", "height": "100"},
+                {**base, "weight": "15.5"},
+            ],
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data == {"recorded": 1}
+        measurement = GrowthMeasurement.objects.get(child=child)
+        assert (float(measurement.weight), float(measurement.height)) == (15.5, 100)
+
     def test_child_list_tenant_isolation(self):
         """Users from different tenants shouldn't see each other's data"""
         # Create another tenant and user
@@ -345,6 +1220,337 @@ class TestAttendanceViews(APITestCase):
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+    def test_bulk_attendance_update_upserts_and_reports_rejected_rows(self):
+        """Valid rows are upserted, invalid ones are reported per row"""
+        AttendanceRecord.objects.create(
+            tenant=self.tenant, child=self.child, date=date.today(), status="present"
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        data = {
+            "records": [
+                {"child_id": self.child.id, "status": "absent"},
+                {"child_id": 999999, "status": "present"},
+            ]
+        }
+        response = self.client.post("/api/attendance/update/", data, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [r["status"] for r in response.data["records"]] == ["absent"]
+        assert response.data["rejected"][0]["child_id"] == 999999
+        assert AttendanceRecord.objects.filter(tenant=self.tenant).count() == 1
+
+    def test_summary_follows_bulk_and_single_writes(self):
+        """Daily counters track both the bulk path and single-record saves"""
+        second = Child.objects.create(
+            tenant=self.tenant, name="Second", parent_name="P", classroom=self.classroom
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        records = [
+            {"child_id": self.child.id, "status": "present"},
+            {"child_id": second.id, "status": "present"},
+        ]
+        self.client.post("/api/attendance/update/", {"records": records}, format="json")
+        record = AttendanceRecord.objects.get(child=second)
+        record.status = "absent"
+        record.save()
+
+        response = self.client.get("/api/attendance/summary/")
+        assert response.data == {"present": 1, "absent": 1}
+
+    def test_bulk_update_recounts_the_day_from_records(self):
+        """Counters follow the stored records, not deltas from a stale read"""
+        other = Child.objects.create(
+            tenant=self.tenant, name="Other", parent_name="P", classroom=self.classroom
+        )
+        # Written by a concurrent request, its counter update not yet applied
+        AttendanceRecord.objects.bulk_create(
+            [
+                AttendanceRecord(
+                    tenant=self.tenant, child=other, date=date.today(), status="present"
+                )
+            ]
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        records = [{"child_id": self.child.id, "status": "present"}]
+        self.client.post("/api/attendance/update/", {"records": records}, format="json")
+        self.client.post("/api/attendance/update/", {"records": records}, format="json")
+
+        response = self.client.get("/api/attendance/summary/")
+        assert response.data == {"present": 2, "absent": 0}
+
+    def test_rebuild_counters_repairs_drift(self):
+        """Reconciliation recomputes counters from raw records"""
+        from attendance.counters import get_summary, rebuild_counters
+        from attendance.models import DailyAttendanceCounter
+
+        AttendanceRecord.objects.create(
+            tenant=self.tenant, child=self.child, date=date.today(), status="absent"
+        )
+        DailyAttendanceCounter.objects.filter(tenant=self.tenant).update(absent=7)
+
+        rebuild_counters(tenant_id=self.tenant.id)
+
+        assert get_summary(self.tenant.id, date.today()) == {"present": 0, "absent": 1}
+
+    def test_attendance_analytics_groups_by_classroom(self):
+        """Analytics aggregates counts and rates per classroom over a range"""
+        today = date.today()
+        for offset, value in enumerate(["present", "present", "absent", "present"]):
+            AttendanceRecord.objects.create(
+                tenant=self.tenant,
+                child=self.child,
+                date=today - timedelta(days=offset),
+                status=value,
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get(
+            "/api/attendance/analytics/",
+            {"start": (today - timedelta(days=10)).isoformat(), "group_by": "classroom"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        row = response.data["results"][0]
+        assert row["classroom_id"] == self.classroom.id
+        assert (row["present"], row["absent"], row["total"]) == (3, 1, 4)
+        assert row["rate"] == 0.75
+
+    def test_attendance_analytics_groups_by_tenant_and_child(self):
+        """Tenant and child groupings return their keys with the same counts"""
+        today = date.today()
+        second = Child.objects.create(
+            tenant=self.tenant, name="Second", parent_name="P", classroom=self.classroom
+        )
+        for child, value in [(self.child, "present"), (second, "absent")]:
+            AttendanceRecord.objects.create(
+                tenant=self.tenant, child=child, date=today, status=value
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+        def results(group_by):
+            response = self.client.get(
+                "/api/attendance/analytics/", {"group_by": group_by}
+            )
+            assert response.status_code == status.HTTP_200_OK
+            return response.data["results"]
+
+        (tenant_row,) = results("tenant")
+        assert tenant_row["tenant_id"] == self.tenant.id
+        assert (tenant_row["present"], tenant_row["total"]) == (1, 2)
+        assert tenant_row["rate"] == 0.5
+
+        child_rows = {row["child_id"]: row for row in results("child")}
+        assert child_rows[self.child.id]["child_name"] == "Test Child"
+        assert child_rows[self.child.id]["rate"] == 1.0
+        assert child_rows[second.id]["absent"] == 1
+
+    def test_attendance_import_streams_csv_in_chunks(self):
+        """CSV import writes valid rows and reports bad lines"""
+        from attendance.importers import import_attendance
+
+        yesterday = date.today() - timedelta(days=1)
+        lines = [
+            "child,date,status\n",
+            f"{self.child.id},{yesterday},absent\n",
+            f"{self.child.id},{yesterday - timedelta(days=1)},present\n",
+            f"999999,{yesterday},present\n",
+            f"{self.child.id},not-a-date,present\n",
+        ]
+
+        result = import_attendance(lines, self.tenant, fmt="csv", chunk_size=2)
+
+        assert result["imported"] == 2
+        assert sorted(e["line"] for e in result["errors"]) == [4, 5]
+        assert AttendanceRecord.objects.get(date=yesterday).status == "absent"
+
+    def test_attendance_import_with_bad_encoding_writes_nothing(self):
+        """A decoding error after written chunks rolls the whole upload back"""
+        from attendance.importers import IMPORT_CHUNK_SIZE
+
+        row = f"{self.child.id},{date.today() - timedelta(days=1)},absent\n".encode()
+        upload = SimpleUploadedFile(
+            "attendance.csv",
+            b"child,date,status\n" + row * IMPORT_CHUNK_SIZE + b"\xff\xfe,bad,row\n",
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            "/api/attendance/import/", {"file": upload}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not AttendanceRecord.objects.filter(tenant=self.tenant).exists()
+
+    def test_attendance_import_rejects_non_text_ndjson_status(self):
+        """A status of another JSON type is a rejected line, not a failed import"""
+        from attendance.importers import import_attendance
+
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        lines = [
+            json.dumps({"child": self.child.id, "date": yesterday, "status": 1}),
+            json.dumps({"child": self.child.id, "date": yesterday, "status": "absent"}),
+        ]
+
+        result = import_attendance(lines, self.tenant, fmt="ndjson")
+
+        assert (result["imported"], result["rejected"]) == (1, 1)
+        assert result["errors"][0]["line"] == 1
+
+    def test_classroom_roster_includes_unmarked_children(self):
+        """Roster lists every child of the class with the day's status or None"""
+        unmarked = Child.objects.create(
+            tenant=self.tenant,
+            name="Zed",
+            parent_name="P",
+            classroom=self.classroom,
+            avatar="avatars/1/zed.png",
+            avatar_variants={"thumb": {"webp": "avatars/1/zed_thumb.webp"}},
+        )
+        AttendanceRecord.objects.create(
+            tenant=self.tenant, child=self.child, date=date.today(), status="absent"
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/attendance/roster/", {"classroom": self.classroom.id}
+            )
+
+        selects = [q for q in queries.captured_queries if q["sql"].startswith("SELECT")]
+        assert len(selects) == 1
+        statuses = {row["id"]: row["status"] for row in response.data["children"]}
+        assert statuses == {self.child.id: "absent", unmarked.id: None}
+        first, zed = response.data["children"]
+        assert (first["avatar"], first["avatar_thumb"]) == ("", None)
+        assert zed["avatar"] == "http://testserver/media/avatars/1/zed.png"
+        assert zed["avatar_thumb"] == {
+            "webp": "http://testserver/media/avatars/1/zed_thumb.webp"
+        }
+
+    def test_extra_hour_batch_action_only_transitions_pending(self):
+        """Batch decisions update pending requests and skip the rest"""
+        from datetime import time
+
+        pending = ExtraHourRequest.objects.create(
+            tenant=self.tenant, child=self.child, start=time(16), end=time(17)
+        )
+        decided = ExtraHourRequest.objects.create(
+            tenant=self.tenant,
+            child=self.child,
+            start=time(17),
+            end=time(18),
+            status="rejected",
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            "/api/attendance/extra/action/",
+            {"ids": [pending.id, decided.id], "action": "approved"},
+            format="json",
+        )
+
+        assert response.data["updated"] == 1
+        assert response.data["skipped"] == [decided.id]
+        decided.refresh_from_db()
+        assert decided.status == "rejected"
+
+        for ids in [str(pending.id), [pending.id, "x"], [1.5], [True], None]:
+            response = self.client.post(
+                "/api/attendance/extra/action/",
+                {"ids": ids, "action": "rejected"},
+                format="json",
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        pending.refresh_from_db()
+        assert pending.status == "approved"
+
+    def test_extra_hour_request_rejects_overlaps(self):
+        """Overlapping requests for a child and day are refused"""
+        from datetime import time
+
+        ExtraHourRequest.objects.create(
+            tenant=self.tenant, child=self.child, start=time(16), end=time(17)
+        )
+        ExtraHourRequest.objects.create(
+            tenant=self.tenant,
+            child=self.child,
+            start=time(18),
+            end=time(19),
+            status="rejected",
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        def submit(start, end):
+            data = {"child": self.child.id, "start": start, "end": end}
+            return self.client.post("/api/attendance/extra-hours/", data, format="json")
+
+        assert submit("16:30", "17:30").status_code == 400
+        assert submit("15:00", "15:00").status_code == 400
+        # Touching intervals and rejected requests do not conflict
+        assert submit("17:00", "18:00").status_code == 201
+        assert submit("18:15", "18:45").status_code == 201
+
+    def test_extra_hour_statements_sum_approved_minutes(self):
+        """Statements total approved minutes per child and month"""
+        from datetime import time
+        from attendance.billing import generate_statements
+
+        day = date.today()
+        for start, end, state in [
+            (time(16), time(17, 30), "approved"),
+            (time(8), time(8, 45), "approved"),
+            (time(18), time(19), "rejected"),
+        ]:
+            ExtraHourRequest.objects.create(
+                tenant=self.tenant,
+                child=self.child,
+                date=day,
+                start=start,
+                end=end,
+                status=state,
+            )
+
+        assert generate_statements(self.tenant.id, day) == 1
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(
+            "/api/attendance/statements/", {"month": day.strftime("%Y-%m")}
+        )
+
+        statement = response.data["results"][0]
+        assert statement["minutes"] == 135
+        assert statement["requests_count"] == 2
+
+        # Rejecting the last approved requests removes the statement
+        ExtraHourRequest.objects.update(status="rejected")
+        assert generate_statements(self.tenant.id, day) == 0
+        assert not ExtraHourStatement.objects.exists()
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="Partitioning is PostgreSQL-only"
+    )
+    def test_attendance_table_partitioning_keeps_data_and_upserts(self):
+        """Converted table keeps rows, prunes by month and still accepts upserts"""
+        from attendance import partitions
+
+        old_day = date.today() - timedelta(days=120)
+        AttendanceRecord.objects.create(
+            tenant=self.tenant, child=self.child, date=old_day, status="present"
+        )
+
+        assert partitions.convert_to_partitioned(months_ahead=2) >= 7
+        assert partitions.is_partitioned()
+
+        self.client.force_authenticate(user=self.admin_user)
+        records = [{"child_id": self.child.id, "status": "absent"}]
+        self.client.post("/api/attendance/update/", {"records": records}, format="json")
+
+        assert AttendanceRecord.objects.filter(tenant=self.tenant).count() == 2
+        assert partitions.detach_partitions_before(1) != []
+        assert not AttendanceRecord.objects.filter(date=old_day).exists()
+
 
 # ============================================================================
 # SERIALIZER TESTS